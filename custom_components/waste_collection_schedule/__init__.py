@@ -1,6 +1,9 @@
 """Waste Collection Schedule Component."""
+import json
 import logging
 import site
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 from random import randrange
 
@@ -8,9 +11,14 @@ import homeassistant.helpers.config_validation as cv
 import homeassistant.util.dt as dt_util
 import voluptuous as vol
 from homeassistant.core import HomeAssistant, ServiceCall, callback
-from homeassistant.helpers.dispatcher import dispatcher_send
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_send,
+    dispatcher_send,
+)
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 
-from .const import DOMAIN, UPDATE_SENSORS_SIGNAL
+from .const import DOMAIN, EVENT_SCHEDULE_CHANGED, UPDATE_SENSORS_SIGNAL
 
 from homeassistant.helpers.event import async_call_later  # isort:skip
 from homeassistant.helpers.event import async_track_time_change  # isort:skip
@@ -19,9 +27,32 @@ from homeassistant.helpers.event import async_track_time_change  # isort:skip
 package_dir = Path(__file__).resolve().parents[0]
 site.addsitedir(str(package_dir))
 from waste_collection_schedule import Customize, SourceShell  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.source_shell import DEFAULT_FETCH_TIMEOUT, DEFAULT_MAX_REFRESH_INTERVAL, DEFAULT_MIN_REFRESH_INTERVAL  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.http_client import configure_host_limits, refresh_cycle  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.archive import CollectionArchive  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.id_cache import configure_id_cache  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.profiling import FetchProfile, format_report, trace_events  # type: ignore # isort:skip # noqa: E402
 
 _LOGGER = logging.getLogger(__name__)
 
+# last successful fetch result of every source, restored on startup
+STORAGE_KEY = f"{DOMAIN}.cache"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# ids resolved from addresses by the sources, see id_cache.py
+ID_CACHE_FILENAME = f"{DOMAIN}.id_cache"
+
+# all collections which have ever been fetched, see archive.py
+ARCHIVE_FILENAME = f"{DOMAIN}.archive.sqlite"
+
+# written to the config directory by the dump_diagnostics service
+DIAGNOSTICS_FILENAME = f"{DOMAIN}_diagnostics.json"
+TRACE_FILENAME = f"{DOMAIN}_trace.json"
+
+# written to the config directory by fetch_data with profile: true
+PROFILE_FILENAME = f"{DOMAIN}_profile.txt"
+
 CONF_SOURCES = "sources"
 CONF_SOURCE_NAME = "name"
 CONF_SOURCE_ARGS = "args"  # source arguments
@@ -30,6 +61,14 @@ CONF_SEPARATOR = "separator"
 CONF_FETCH_TIME = "fetch_time"
 CONF_RANDOM_FETCH_TIME_OFFSET = "random_fetch_time_offset"
 CONF_DAY_SWITCH_TIME = "day_switch_time"
+CONF_MAX_PARALLEL_FETCHES = "max_parallel_fetches"
+CONF_FETCH_TIMEOUT = "fetch_timeout"
+CONF_HOST_REQUESTS_PER_SECOND = "host_requests_per_second"
+CONF_HOST_MAX_IN_FLIGHT = "host_max_in_flight"
+CONF_MIN_REFRESH_INTERVAL = "min_refresh_interval"
+CONF_MAX_REFRESH_INTERVAL = "max_refresh_interval"
+CONF_PROFILE = "profile"
+CONF_ARCHIVE = "archive"
 
 CONF_CUSTOMIZE = "customize"
 CONF_TYPE = "type"
@@ -60,6 +99,7 @@ SOURCE_CONFIG = vol.Schema(
             cv.ensure_list, [CUSTOMIZE_CONFIG]
         ),
         vol.Optional(CONF_SOURCE_CALENDAR_TITLE): cv.string,
+        vol.Optional(CONF_FETCH_TIMEOUT): vol.All(vol.Coerce(int), vol.Range(min=1)),
     }
 )
 
@@ -74,15 +114,50 @@ CONFIG_SCHEMA = vol.Schema(
                     CONF_RANDOM_FETCH_TIME_OFFSET, default=60
                 ): cv.positive_int,
                 vol.Optional(CONF_DAY_SWITCH_TIME, default="10:00"): cv.time,
+                vol.Optional(CONF_MAX_PARALLEL_FETCHES, default=4): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+                vol.Optional(
+                    CONF_FETCH_TIMEOUT, default=DEFAULT_FETCH_TIMEOUT
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_HOST_REQUESTS_PER_SECOND, default=2): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_HOST_MAX_IN_FLIGHT, default=2): cv.positive_int,
+                vol.Optional(
+                    CONF_MIN_REFRESH_INTERVAL, default=DEFAULT_MIN_REFRESH_INTERVAL
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MAX_REFRESH_INTERVAL, default=DEFAULT_MAX_REFRESH_INTERVAL
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_ARCHIVE, default=True): cv.boolean,
             }
         )
     },
     extra=vol.ALLOW_EXTRA,
 )
 
+FETCH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_PROFILE, default=False): cv.boolean,
+        # calendar title or source index (like source_index of a sensor), kept
+        # as string so a title like "2024" can't be taken for an index
+        vol.Optional(CONF_SOURCES): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the component. config contains data from configuration.yaml."""
+    # limit requests to the same host, shared by all sources
+    configure_host_limits(
+        requests_per_second=config[DOMAIN][CONF_HOST_REQUESTS_PER_SECOND],
+        max_in_flight=config[DOMAIN][CONF_HOST_MAX_IN_FLIGHT],
+    )
+
+    # keep resolved ids across restarts, the file is loaded on first use
+    configure_id_cache(hass.config.path(STORAGE_DIR, ID_CACHE_FILENAME))
+
     # create empty api object as singleton
     api = WasteCollectionApi(
         hass,
@@ -90,6 +165,12 @@ async def async_setup(hass: HomeAssistant, config: dict):
         fetch_time=config[DOMAIN][CONF_FETCH_TIME],
         random_fetch_time_offset=config[DOMAIN][CONF_RANDOM_FETCH_TIME_OFFSET],
         day_switch_time=config[DOMAIN][CONF_DAY_SWITCH_TIME],
+        max_parallel_fetches=config[DOMAIN][CONF_MAX_PARALLEL_FETCHES],
+        min_refresh_interval=config[DOMAIN][CONF_MIN_REFRESH_INTERVAL],
+        max_refresh_interval=config[DOMAIN][CONF_MAX_REFRESH_INTERVAL],
+        archive=CollectionArchive(hass.config.path(STORAGE_DIR, ARCHIVE_FILENAME))
+        if config[DOMAIN][CONF_ARCHIVE]
+        else None,
     )
 
     # create shells for source(s)
@@ -111,25 +192,62 @@ async def async_setup(hass: HomeAssistant, config: dict):
             customize=customize,
             calendar_title=source.get(CONF_SOURCE_CALENDAR_TITLE),
             source_args=source.get(CONF_SOURCE_ARGS, {}),
+            fetch_timeout=source.get(
+                CONF_FETCH_TIMEOUT, config[DOMAIN][CONF_FETCH_TIMEOUT]
+            ),
         )
 
     # store api object
     hass.data.setdefault(DOMAIN, api)
 
+    # show data of the last run until the sources have been fetched again,
+    # restored before the platforms are loaded so their entities start with it
+    restored = await api.async_restore_cache()
+    if restored:
+        await hass.async_add_executor_job(api._update_archive, api.shells)
+        # sensors of the sensor platform may have been set up already
+        async_dispatcher_send(hass, UPDATE_SENSORS_SIGNAL)
+
     # load calendar platform
     await hass.helpers.discovery.async_load_platform(
         "calendar", DOMAIN, {"api": api}, config
     )
 
+    # load sensor platform for the diagnostic sensors of the sources
+    await hass.helpers.discovery.async_load_platform(
+        "sensor", DOMAIN, {"api": api}, config
+    )
+
     # initial fetch of all data
-    hass.add_job(api._fetch)
+    if restored:
+        # revalidate sources which are due in the background, don't delay the
+        # startup
+        async_at_started(hass, api._fetch_now_callback)
+    else:
+        hass.add_job(api._fetch)
 
     async def async_fetch_data(service: ServiceCall) -> None:
-        hass.add_job(api._fetch)
+        sources = service.data.get(CONF_SOURCES)
+        shells = api.shells if sources is None else api.select_shells(sources)
+        if service.data[CONF_PROFILE]:
+            hass.add_job(api._profile, shells, hass.config.path(PROFILE_FILENAME))
+        else:
+            hass.add_job(api._fetch_and_update, shells)
 
     # Register new Service fetch_data
     hass.services.async_register(
-        DOMAIN, "fetch_data", async_fetch_data, schema=vol.Schema({})
+        DOMAIN, "fetch_data", async_fetch_data, schema=FETCH_DATA_SCHEMA
+    )
+
+    async def async_dump_diagnostics(service: ServiceCall) -> None:
+        path = hass.config.path(DIAGNOSTICS_FILENAME)
+        trace_path = hass.config.path(TRACE_FILENAME)
+        await hass.async_add_executor_job(api.dump_diagnostics, path, trace_path)
+        _LOGGER.info(f"diagnostics written to {path} and {trace_path}")
+
+    # Register new Service dump_diagnostics
+    hass.services.async_register(
+        DOMAIN, "dump_diagnostics", async_dump_diagnostics, schema=vol.Schema({})
     )
 
     return True
@@ -137,7 +255,16 @@ async def async_setup(hass: HomeAssistant, config: dict):
 
 class WasteCollectionApi:
     def __init__(
-        self, hass, separator, fetch_time, random_fetch_time_offset, day_switch_time
+        self,
+        hass,
+        separator,
+        fetch_time,
+        random_fetch_time_offset,
+        day_switch_time,
+        max_parallel_fetches=1,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_refresh_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+        archive=None,
     ):
         self._hass = hass
         self._source_shells = []
@@ -145,6 +272,12 @@ class WasteCollectionApi:
         self._fetch_time = fetch_time
         self._random_fetch_time_offset = random_fetch_time_offset
         self._day_switch_time = day_switch_time
+        self._max_parallel_fetches = max_parallel_fetches
+        self._min_refresh_interval = min_refresh_interval
+        self._max_refresh_interval = max(min_refresh_interval, max_refresh_interval)
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._retry_unsub = None
+        self._archive = archive
 
         # start timer to fetch date once per day
         async_track_time_change(
@@ -176,6 +309,11 @@ class WasteCollectionApi:
                 midnight.second,
             )
 
+    @property
+    def archive(self):
+        """CollectionArchive of all fetched collections, None if disabled."""
+        return self._archive
+
     @property
     def separator(self):
         """Separator string, used to separator waste types."""
@@ -197,27 +335,279 @@ class WasteCollectionApi:
         customize,
         source_args,
         calendar_title,
+        fetch_timeout=DEFAULT_FETCH_TIMEOUT,
     ):
         new_shell = SourceShell.create(
             source_name=source_name,
             customize=customize,
             source_args=source_args,
             calendar_title=calendar_title,
+            fetch_timeout=fetch_timeout,
         )
 
         if new_shell:
             self._source_shells.append(new_shell)
 
     def _fetch(self, *_):
+        """Fetch all shells, regardless of their refresh interval."""
+        self._fetch_and_update(self._source_shells)
+
+    def _fetch_due(self, *_):
+        """Fetch the shells whose refresh interval has elapsed."""
+        shells = [
+            shell
+            for shell in self._source_shells
+            if shell.fetch_due(self._min_refresh_interval, self._max_refresh_interval)
+        ]
+        _LOGGER.debug(
+            f"fetching {len(shells)} of {len(self._source_shells)} sources, the others are up to date"
+        )
+        self._fetch_and_update(shells)
+
+    def _fetch_and_update(self, shells):
+        # shells which request the same data share the responses
+        with refresh_cycle():
+            fetched = self._fetch_shells(shells)
+        self._fetch_done(fetched)
+
+    def _profile(self, shells, path):
+        """Fetch shells one after another under the profiler.
+
+        The shells are not fetched in parallel, so the time a shell spends
+        waiting for the network isn't distorted by the others. The report is
+        written to path.
+        """
+        profiles = []
+        fetched = []
+        with refresh_cycle():
+            for shell in shells:
+                profile = FetchProfile()
+                if shell.fetch(profile=profile):
+                    profiles.append((shell.calendar_title, profile))
+                    fetched.append(shell)
+        with open(path, "w") as f:
+            f.write(format_report(profiles))
+        _LOGGER.info(f"profile of {len(profiles)} sources written to {path}")
+        self._fetch_done(fetched)
+
+    def _retry(self, *_):
+        """Fetch shells again which failed because their host was down.
+
+        The shells are fetched one after another: the first one probes the
+        host, the others fail fast if the host is still down.
+        """
+        shells = [s for s in self._source_shells if s.retry_delay is not None]
+        with refresh_cycle():
+            fetched = [shell for shell in shells if shell.fetch()]
+        self._fetch_done(fetched)
+
+    def _fetch_done(self, shells):
+        """Store the results of the fetched shells and update the sensors.
+
+        shells must only contain the shells fetched by the caller, a shell
+        which has been skipped is handled by the caller which fetched it.
+        """
+        self._schedule_retry()
+        if not shells:
+            return
+        self._update_archive(shells)
+        self._fire_change_events(shells)
+        self._hass.add_job(self._async_save_cache)
+        self._update_sensors_callback()
+
+    def _fire_change_events(self, shells):
+        """Fire one event per shell whose upcoming collections changed."""
+        for shell in shells:
+            if not shell.changes:
+                continue
+            changes = {
+                t: {
+                    "added": [d.isoformat() for d in change["added"]],
+                    "removed": [d.isoformat() for d in change["removed"]],
+                    "moved": [
+                        {"from": old.isoformat(), "to": new.isoformat()}
+                        for old, new in change["moved"]
+                    ],
+                }
+                for t, change in shell.changes.items()
+            }
+            self._hass.bus.fire(
+                EVENT_SCHEDULE_CHANGED,
+                {
+                    "source": shell.title,
+                    "calendar_title": shell.calendar_title,
+                    "unique_id": shell.unique_id,
+                    "changes": changes,
+                },
+            )
+
+    def _update_archive(self, shells):
+        """Add the entries of the shells to the archive.
+
+        Also updates the last archived collections of the shells, which are
+        needed by the sensors without accessing the archive. Only collections
+        before the archive cutoff are considered, later ones may have been
+        moved.
+        """
+        if self._archive is None:
+            return
+        for shell in shells:
+            if shell.refreshtime is None:
+                continue
+            try:
+                self._archive.add(shell.unique_id, shell.fetched_entries)
+                shell.set_archived_last(
+                    self._archive.get_last(shell.unique_id, shell.archive_cutoff())
+                )
+            except sqlite3.Error as exc:
+                _LOGGER.warning(f"failed to archive source {shell.title}: {exc}")
+
+    def _schedule_retry(self):
+        delays = [
+            shell.retry_delay
+            for shell in self._source_shells
+            if shell.retry_delay is not None
+        ]
+        if delays:
+            self._hass.add_job(self._async_schedule_retry, min(delays))
+
+    @callback
+    def _async_schedule_retry(self, delay):
+        if self._retry_unsub is not None:
+            self._retry_unsub()
+        self._retry_unsub = async_call_later(self._hass, delay, self._retry_callback)
+
+    async def async_restore_cache(self):
+        """Restore entries of all shells from the last run.
+
+        Returns True if data for at least one shell has been restored.
+        """
+        data = await self._store.async_load()
+        if not data:
+            return False
+
+        restored = False
         for shell in self._source_shells:
-            shell.fetch()
+            cached = data.get("sources", {}).get(shell.unique_id)
+            if cached is None:
+                continue
+            try:
+                shell.restore_cache(cached)
+                restored = True
+            except (KeyError, IndexError, TypeError, ValueError):
+                _LOGGER.warning(f"ignoring invalid cache for source {shell.title}")
+        return restored
 
-        self._update_sensors_callback()
+    @callback
+    def _async_save_cache(self):
+        self._store.async_delay_save(self._cache_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _cache_data(self):
+        sources = {}
+        for shell in self._source_shells:
+            cached = shell.to_cache()
+            if cached is not None:
+                sources[shell.unique_id] = cached
+        return {"sources": sources}
+
+    def _fetch_shells(self, shells):
+        """Fetch the given shells, at most max_parallel_fetches at a time.
+
+        Every shell stores its own result, so a slow or failing source does not
+        hold back the others. Returns the shells which have been fetched by
+        this call, after all shells have finished.
+        """
+        if len(shells) == 0:
+            return []
+
+        workers = min(self._max_parallel_fetches, len(shells))
+        if workers == 1:
+            return [shell for shell in shells if shell.fetch()]
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="wcs_fetch"
+        ) as executor:
+            futures = {executor.submit(shell.fetch): shell for shell in shells}
+            wait(futures)
+
+        fetched = []
+        for future, shell in futures.items():
+            exc = future.exception()
+            if exc is not None:
+                _LOGGER.error(f"fetch failed for source {shell.title}: {exc!r}")
+            elif future.result():
+                fetched.append(shell)
+        return fetched
 
     @property
     def shells(self):
         return self._source_shells
 
+    def diagnostics(self):
+        """Return fetch metrics and state of all shells."""
+        sources = []
+        for shell in self._source_shells:
+            refreshtime = shell.refreshtime
+            sources.append(
+                {
+                    "source": shell.title,
+                    "calendar_title": shell.calendar_title,
+                    "unique_id": shell.unique_id,
+                    "fetch_status": getattr(shell.fetch_status, "value", None),
+                    "refreshtime": refreshtime.isoformat(timespec="seconds")
+                    if refreshtime is not None
+                    else None,
+                    "refresh_interval": shell.refresh_interval(
+                        self._min_refresh_interval, self._max_refresh_interval
+                    ),
+                    "import_time": shell.import_time,
+                    "retry_delay": shell.retry_delay,
+                    "metrics": shell.metrics.as_dict(),
+                    "collections_per_year": self._get_yearly_counts(shell),
+                    "requests": shell.metrics.spans,
+                }
+            )
+        return {"sources": sources}
+
+    def _get_yearly_counts(self, shell):
+        if self._archive is None:
+            return None
+        try:
+            return self._archive.get_yearly_counts(shell.unique_id)
+        except sqlite3.Error as exc:
+            _LOGGER.warning(f"failed to read archive of source {shell.title}: {exc}")
+            return None
+
+    def dump_diagnostics(self, path, trace_path=None):
+        with open(path, "w") as f:
+            json.dump(self.diagnostics(), f, indent=2)
+        if trace_path is not None:
+            fetches = [(s.calendar_title, s.metrics) for s in self._source_shells]
+            with open(trace_path, "w") as f:
+                json.dump(trace_events(fetches), f)
+
+    def select_shells(self, sources):
+        """Return shells for a list of calendar titles and source indexes.
+
+        A source is matched by its calendar title first, a number only selects
+        the source with this index if no calendar title matches.
+        """
+        shells = []
+        for source in sources:
+            source = str(source)
+            shell = next(
+                (s for s in self._source_shells if s.calendar_title == source),
+                None,
+            )
+            if shell is None and source.isdigit():
+                shell = self.get_shell(int(source))
+            if shell is None:
+                _LOGGER.warning(f"source not found: {source}")
+            elif shell not in shells:
+                shells.append(shell)
+        return shells
+
     def get_shell(self, index):
         return self._source_shells[index] if index < len(self._source_shells) else None
 
@@ -231,7 +621,12 @@ class WasteCollectionApi:
 
     @callback
     def _fetch_now_callback(self, *_):
-        self._hass.add_job(self._fetch)
+        self._hass.add_job(self._fetch_due)
+
+    @callback
+    def _retry_callback(self, *_):
+        self._retry_unsub = None
+        self._hass.add_job(self._retry)
 
     @callback
     def _update_sensors_callback(self, *_):
@@ -1,8 +1,10 @@
 """Calendar platform support for Waste Collection Schedule."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from functools import partial
 
+import homeassistant.util.dt as dt_util
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.core import HomeAssistant
 
@@ -99,20 +101,37 @@ class WasteCollectionCalendar(CalendarEntity):
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
     ):
-        """Return all events within specified time span."""
-        events = []
-
-        for collection in self._aggregator.get_upcoming(
-            include_today=True,
+        """Return all events within specified time span, including past events."""
+        # all-day events which overlap the time span
+        start = dt_util.as_local(start_date).date()
+        end = dt_util.as_local(end_date)
+        end = end.date() + timedelta(days=0 if end.time() == time.min else 1)
+
+        collections = self._aggregator.get_range(
+            start,
+            end,
             include_types=self._include_types,
             exclude_types=self._exclude_types,
-        ):
-            event = self._convert(collection)
+        )
 
-            if start_date <= event.start_datetime_local <= end_date:
-                events.append(event)
+        # add past collections which are no longer returned by the source
+        archive = self._api.archive
+        if archive is not None:
+            archived = await hass.async_add_executor_job(
+                partial(
+                    self._aggregator.get_archived_range,
+                    archive,
+                    start,
+                    end,
+                    include_types=self._include_types,
+                    exclude_types=self._exclude_types,
+                )
+            )
+            known = {(c.ordinal, c.type) for c in collections}
+            collections.extend(c for c in archived if (c.ordinal, c.type) not in known)
+            collections.sort(key=lambda c: c.ordinal)
 
-        return events
+        return [self._convert(collection) for collection in collections]
 
     def _convert(self, collection) -> CalendarEvent:
         """Convert an collection into a Home Assistant calendar event."""
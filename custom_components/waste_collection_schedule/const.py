@@ -4,3 +4,6 @@
 DOMAIN = "waste_collection_schedule"
 
 UPDATE_SENSORS_SIGNAL = "wcs_update_sensors_signal"
+
+# fired if a fetch changed the upcoming collections of a source
+EVENT_SCHEDULE_CHANGED = f"{DOMAIN}_schedule_changed"
@@ -6,10 +6,16 @@ from enum import Enum
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
+from homeassistant.components.sensor import (
+    PLATFORM_SCHEMA,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.const import CONF_NAME, CONF_VALUE_TEMPLATE
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 
 # fmt: off
 from custom_components.waste_collection_schedule.waste_collection_schedule.collection_aggregator import \
@@ -29,6 +35,7 @@ CONF_LEADTIME = "leadtime"
 CONF_DATE_TEMPLATE = "date_template"
 CONF_COLLECTION_TYPES = "types"
 CONF_ADD_DAYS_TO = "add_days_to"
+CONF_ADD_DAYS_SINCE = "add_days_since"
 CONF_EVENT_INDEX = "event_index"
 
 
@@ -38,7 +45,7 @@ class DetailsFormat(Enum):
     upcoming = "upcoming"  # list of "<date> <type1, type2, ...>"
     appointment_types = "appointment_types"  # list of "<type> <date>"
     generic = "generic"  # all values in separate attributes
-    hidden = "hidden" # hide details
+    hidden = "hidden"  # hide details
 
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
@@ -54,12 +61,41 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
         vol.Optional(CONF_VALUE_TEMPLATE): cv.template,
         vol.Optional(CONF_DATE_TEMPLATE): cv.template,
         vol.Optional(CONF_ADD_DAYS_TO, default=False): cv.boolean,
+        vol.Optional(CONF_ADD_DAYS_SINCE, default=False): cv.boolean,
         vol.Optional(CONF_EVENT_INDEX, default=0): cv.positive_int,
     }
 )
 
+# fetch metrics of every source, exposed as diagnostic sensors:
+# key in FetchMetrics.as_dict(), name, unit, device class, enabled by default
+FETCH_METRICS = (
+    ("duration", "fetch duration", "s", SensorDeviceClass.DURATION, True),
+    (
+        "average_duration",
+        "average fetch duration",
+        "s",
+        SensorDeviceClass.DURATION,
+        False,
+    ),
+    ("parse_time", "parse time", "s", SensorDeviceClass.DURATION, False),
+    ("requests", "requests", None, None, False),
+    ("bytes", "downloaded bytes", "B", SensorDeviceClass.DATA_SIZE, False),
+    ("entries", "entries", None, None, False),
+    ("consecutive_failures", "consecutive failures", None, None, True),
+)
+
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    if discovery_info is not None:
+        # diagnostic sensors for all sources, loaded by the component
+        api = discovery_info["api"]
+        async_add_entities(
+            FetchMetricSensor(hass, shell, *metric)
+            for shell in api.shells
+            for metric in FETCH_METRICS
+        )
+        return
+
     value_template = config.get(CONF_VALUE_TEMPLATE)
     if value_template is not None:
         value_template.hass = hass
@@ -91,6 +127,7 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
             value_template=value_template,
             date_template=date_template,
             add_days_to=config.get(CONF_ADD_DAYS_TO),
+            add_days_since=config.get(CONF_ADD_DAYS_SINCE),
             event_index=config.get(CONF_EVENT_INDEX),
         )
     )
@@ -115,6 +152,7 @@ class ScheduleSensor(SensorEntity):
         date_template,
         add_days_to,
         event_index,
+        add_days_since=False,
     ):
         """Initialize the entity."""
         self._api = api
@@ -126,6 +164,7 @@ class ScheduleSensor(SensorEntity):
         self._value_template = value_template
         self._date_template = date_template
         self._add_days_to = add_days_to
+        self._add_days_since = add_days_since
         self._event_index = event_index
 
         self._value = None
@@ -264,8 +303,54 @@ class ScheduleSensor(SensorEntity):
             if self._add_days_to:
                 attributes["daysTo"] = upcoming1[0].daysTo
 
+        if self._add_days_since:
+            last = self._aggregator.get_last(include_types=self._collection_types)
+            if last is not None:
+                attributes["daysSince"] = -last.daysTo
+
         self._attr_extra_state_attributes = attributes
         self._add_refreshtime()
 
         if self.hass is not None:
             self.async_write_ha_state()
+
+
+class FetchMetricSensor(SensorEntity):
+    """Diagnostic sensor for one fetch metric of a source."""
+
+    def __init__(self, hass, shell, key, name, unit, device_class, enabled):
+        """Initialize the entity."""
+        self._shell = shell
+        self._key = key
+
+        # entity attributes
+        self._attr_name = f"{shell.calendar_title} {name}"
+        self._attr_unique_id = f"{shell.unique_id}_{key}"
+        self._attr_should_poll = False
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = enabled
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+        async_dispatcher_connect(hass, UPDATE_SENSORS_SIGNAL, self._update_sensor)
+
+    async def async_added_to_hass(self):
+        """Entities have been added to hass."""
+        self._update_sensor()
+
+    @callback
+    def _update_sensor(self):
+        """Update the state, called after every fetch."""
+        metrics = self._shell.metrics.as_dict()
+        self._attr_native_value = metrics[self._key]
+        if self._key == "consecutive_failures":
+            self._attr_extra_state_attributes = {
+                "fetches": metrics["fetches"],
+                "failures": metrics["failures"],
+                "last_error": metrics["last_error"],
+                "fetch_status": getattr(self._shell.fetch_status, "value", None),
+            }
+
+        if self.hass is not None:
+            self.async_write_ha_state()
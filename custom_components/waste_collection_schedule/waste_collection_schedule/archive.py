@@ -0,0 +1,149 @@
+"""Archive of all collections which have ever been fetched.
+
+Sources usually return only a limited time span, so past collections are
+lost with the next fetch. The archive keeps every (source, date, type) in a
+SQLite database. Rows are only added, never changed or removed; a collection
+which is fetched again is stored only once.
+
+The types are stored as returned by the source, before customize is applied,
+so a changed customize configuration also applies to archived collections.
+
+All methods block on file I/O and must not be called from the event loop.
+"""
+
+import datetime
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS collections (
+    source INTEGER NOT NULL REFERENCES sources (id),
+    date INTEGER NOT NULL,  -- proleptic Gregorian ordinal
+    type TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,  -- epoch seconds of the first fetch
+    PRIMARY KEY (source, date, type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS collections_by_type
+    ON collections (source, type, date);
+"""
+
+
+class CollectionArchive:
+    """Append-only archive of collections per source, stored in SQLite.
+
+    The database is opened on first access, so creating the archive doesn't
+    block. Without path, the archive lives in memory only.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._source_ids = {}  # source key -> id
+
+    def add(self, source, entries):
+        """Store entries of a source, returns the number of new collections.
+
+        source -- unique key of the source, e.g. SourceShell.unique_id
+        entries -- iterable of (date, type)
+        """
+        now = int(time.time())
+        with self._lock:
+            db = self._connect()
+            source_id = self._get_source_id(source)
+            with db:
+                before = db.total_changes
+                db.executemany(
+                    "INSERT OR IGNORE INTO collections VALUES (?, ?, ?, ?)",
+                    ((source_id, date.toordinal(), t, now) for date, t in set(entries)),
+                )
+                return db.total_changes - before
+
+    def get_range(self, source, start, end):
+        """Return list of (date, type) with start <= date < end, sorted by date."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT c.date, c.type FROM collections c"
+                " JOIN sources s ON c.source = s.id"
+                " WHERE s.key = ? AND c.date >= ? AND c.date < ?"
+                " ORDER BY c.date",
+                (source, start.toordinal(), end.toordinal()),
+            )
+            return [(datetime.date.fromordinal(d), t) for d, t in rows]
+
+    def get_last(self, source, before):
+        """Return dict of type -> date of the last collection before a date."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT c.type, MAX(c.date) FROM collections c"
+                " JOIN sources s ON c.source = s.id"
+                " WHERE s.key = ? AND c.date < ?"
+                " GROUP BY c.type",
+                (source, before.toordinal()),
+            )
+            return {t: datetime.date.fromordinal(d) for t, d in rows}
+
+    def get_yearly_counts(self, source):
+        """Return dict of year -> type -> number of collections."""
+        with self._lock:
+            db = self._connect()
+            first, last = db.execute(
+                "SELECT MIN(c.date), MAX(c.date) FROM collections c"
+                " JOIN sources s ON c.source = s.id WHERE s.key = ?",
+                (source,),
+            ).fetchone()
+            if first is None:
+                return {}
+
+            # one indexed range query per year, instead of reading all rows
+            result = {}
+            first_year = datetime.date.fromordinal(first).year
+            last_year = datetime.date.fromordinal(last).year
+            for year in range(first_year, last_year + 1):
+                rows = db.execute(
+                    "SELECT c.type, COUNT(*) FROM collections c"
+                    " JOIN sources s ON c.source = s.id"
+                    " WHERE s.key = ? AND c.date >= ? AND c.date < ?"
+                    " GROUP BY c.type ORDER BY c.type",
+                    (
+                        source,
+                        datetime.date(year, 1, 1).toordinal(),
+                        datetime.date(year + 1, 1, 1).toordinal(),
+                    ),
+                )
+                counts = dict(rows.fetchall())
+                if counts:
+                    result[year] = counts
+            return result
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+                self._source_ids = {}
+
+    def _connect(self):
+        if self._db is None:
+            db = sqlite3.connect(self._path or ":memory:", check_same_thread=False)
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    def _get_source_id(self, source):
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO sources (key) VALUES (?)", (source,)
+                )
+            (source_id,) = self._db.execute(
+                "SELECT id FROM sources WHERE key = ?", (source,)
+            ).fetchone()
+            self._source_ids[source] = source_id
+        return source_id
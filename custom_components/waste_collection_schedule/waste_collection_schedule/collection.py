@@ -1,41 +1,82 @@
 import datetime
+import sys
+from collections.abc import Mapping
 from typing import Optional
 
 
-class CollectionBase(dict):  # inherit from dict to enable JSON serialization
+def _intern(t):
+    # str() also drops subclasses like bs4's NavigableString, which keep a
+    # reference to the whole parsed document
+    return sys.intern(str(t)) if isinstance(t, str) else t
+
+
+class CollectionBase(Mapping):  # Mapping provides a dict view for templates
+    """Compact record of a collection.
+
+    The date is stored as ordinal. The dict representation, which is used for
+    JSON serialization and templates, is only built on access.
+    """
+
+    __slots__ = ("_ordinal", "_icon", "_picture")
+
     def __init__(
         self,
         date: datetime.date,
         icon: Optional[str] = None,
         picture: Optional[str] = None,
     ):
-        dict.__init__(self, date=date.isoformat(), icon=icon, picture=picture)
-        self._date = date  # store date also as python date object
+        self._ordinal = date.toordinal()
+        self._icon = icon
+        self._picture = picture
 
     @property
     def date(self):
-        return self._date
+        return datetime.date.fromordinal(self._ordinal)
+
+    @property
+    def ordinal(self):
+        """Date as proleptic Gregorian ordinal, cheap to compare."""
+        return self._ordinal
 
     @property
     def daysTo(self):
-        return (self._date - datetime.datetime.now().date()).days
+        return self._ordinal - datetime.date.today().toordinal()
 
     @property
     def icon(self):
-        return self["icon"]
+        return self._icon
 
     def set_icon(self, icon: str):
-        self["icon"] = icon
+        self._icon = icon
 
     @property
     def picture(self):
-        return self["picture"]
+        return self._picture
 
     def set_picture(self, picture: str):
-        self["picture"] = picture
+        self._picture = picture
+
+    def as_dict(self):
+        """Return JSON serializable representation."""
+        return {
+            "date": self.date.isoformat(),
+            "icon": self._icon,
+            "picture": self._picture,
+        }
+
+    def __getitem__(self, key):
+        return self.as_dict()[key]
+
+    def __iter__(self):
+        return iter(self.as_dict())
+
+    def __len__(self):
+        return len(self.as_dict())
 
 
 class Collection(CollectionBase):
+    __slots__ = ("_type",)
+
     def __init__(
         self,
         date: datetime.date,
@@ -44,22 +85,30 @@ class Collection(CollectionBase):
         picture: Optional[str] = None,
     ):
         CollectionBase.__init__(self, date=date, icon=icon, picture=picture)
-        self["type"] = t
+        self._type = _intern(t)
 
     @property
     def type(self):
-        return self["type"]
+        return self._type
 
     def set_type(self, t: str):
-        self["type"] = t
+        self._type = _intern(t)
+
+    def as_dict(self):
+        d = CollectionBase.as_dict(self)
+        d["type"] = self._type
+        return d
 
     def __repr__(self):
         return f"Collection{{date={self.date}, type={self.type}}}"
 
 
 class CollectionGroup(CollectionBase):
+    __slots__ = ("_types",)
+
     def __init__(self, date: datetime.date):
         CollectionBase.__init__(self, date=date)
+        self._types: list = []
 
     @staticmethod
     def create(group):
@@ -70,12 +119,17 @@ class CollectionGroup(CollectionBase):
             x.set_picture(group[0].picture)
         else:
             x.set_icon(f"mdi:numeric-{len(group)}-box-multiple")
-        x["types"] = list(it.type for it in group)
+        x._types = list(it.type for it in group)
         return x
 
     @property
     def types(self):
-        return self["types"]
+        return self._types
+
+    def as_dict(self):
+        d = CollectionBase.as_dict(self)
+        d["types"] = self._types
+        return d
 
     def __repr__(self):
         return f"CollectionGroup{{date={self.date}, types={self.types}}}"
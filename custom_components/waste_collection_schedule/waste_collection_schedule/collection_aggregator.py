@@ -1,8 +1,9 @@
 import itertools
 import logging
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime
 
-from .collection import CollectionGroup
+from .collection import Collection, CollectionGroup
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,10 +12,44 @@ class CollectionAggregator:
     def __init__(self, shells):
         self._shells = shells
 
+        # Entries of all shells sorted by date. The index is rebuilt only if a
+        # shell got new entries, which is detected by the identity of the list
+        # objects it has been built from.
+        self._indexed_lists = None
+        self._index = []
+        self._dates = []  # date ordinals of _index, for bisect
+        self._type_index = {}  # type -> (entries, date ordinals)
+
+    def _update_index(self):
+        lists = [s._entries for s in self._shells]
+        if self._indexed_lists is not None and all(
+            a is b for a, b in zip(lists, self._indexed_lists)
+        ):
+            return
+
+        # stable sort: entries of the same date keep the order of the sources
+        self._index = sorted(
+            (e for entries in lists for e in entries), key=lambda e: e.ordinal
+        )
+        self._dates = [e.ordinal for e in self._index]
+
+        type_index = {}
+        for e in self._index:
+            entries, dates = type_index.setdefault(e.type, ([], []))
+            entries.append(e)
+            dates.append(e.ordinal)
+        self._type_index = type_index
+        self._indexed_lists = lists
+
     @property
     def _entries(self):
         """Merge all entries from all connected sources."""
-        return [e for s in self._shells for e in s._entries]
+        self._update_index()
+        return self._index
+
+    @property
+    def shells(self):
+        return self._shells
 
     @property
     def refreshtime(self):
@@ -24,7 +59,8 @@ class CollectionAggregator:
     @property
     def types(self):
         """Return set() of all collection types."""
-        return {e.type for e in self._entries}
+        self._update_index()
+        return set(self._type_index)
 
     def get_upcoming(
         self,
@@ -42,7 +78,6 @@ class CollectionAggregator:
         leadtime -- limits the timespan in days of returned entries (default=7, 0 = today)
         """
         return self._filter(
-            self._entries,
             count=count,
             leadtime=leadtime,
             include_types=include_types,
@@ -51,6 +86,65 @@ class CollectionAggregator:
             start_index=start_index,
         )
 
+    def get_range(self, start, end, include_types=None, exclude_types=None):
+        """Return list of entries with start <= date < end.
+
+        In contrast to get_upcoming(), past entries are included. Only the
+        entries within the range are visited.
+        """
+        self._update_index()
+        entries, dates, include_types = self._select_index(include_types)
+        first = bisect_left(dates, start.toordinal())
+        last = bisect_left(dates, end.toordinal(), lo=first)
+        return list(
+            _filter_types(
+                (entries[i] for i in range(first, last)), include_types, exclude_types
+            )
+        )
+
+    def get_archived_range(
+        self, archive, start, end, include_types=None, exclude_types=None
+    ):
+        """Return list of archived entries with start <= date < end.
+
+        Only dates before SourceShell.archive_cutoff() are returned, later
+        dates are covered by the fetched entries. Blocks on the archive, must
+        not be called from the event loop.
+        """
+        entries = []
+        for shell in self._shells:
+            shell_end = min(end, shell.archive_cutoff())
+            if start >= shell_end:
+                continue
+            entries.extend(
+                shell.customize_entries(
+                    Collection(date=date, t=t)
+                    for date, t in archive.get_range(shell.unique_id, start, shell_end)
+                )
+            )
+        entries.sort(key=lambda e: e.ordinal)
+        return list(_filter_types(entries, include_types, exclude_types))
+
+    def get_last(self, include_types=None, exclude_types=None):
+        """Return the last entry before today, None if there is none.
+
+        Besides the fetched entries, the last archived collection of every
+        type is considered, see SourceShell.set_archived_last().
+        """
+        self._update_index()
+        entries, dates, types = self._select_index(include_types)
+        now = datetime.now().date().toordinal()
+        past = (entries[i] for i in range(bisect_left(dates, now) - 1, -1, -1))
+        last = next(_filter_types(past, types, exclude_types), None)
+
+        for shell in self._shells:
+            for e in _filter_types(
+                shell.get_archived_last(), include_types, exclude_types
+            ):
+                if e.ordinal < now and (last is None or e.ordinal > last.ordinal):
+                    last = e
+        return last
+
     def get_upcoming_group_by_day(
         self,
         count=None,
@@ -61,31 +155,21 @@ class CollectionAggregator:
         start_index=None,
     ):
         """Return list of all entries, grouped by day, limited by count and/or leadtime."""
-        entries = []
-
         iterator = itertools.groupby(
-            self._filter(
-                self._entries,
+            self._iter_upcoming(
                 leadtime=leadtime,
                 include_types=include_types,
                 exclude_types=exclude_types,
                 include_today=include_today,
             ),
-            lambda e: e.date,
+            lambda e: e.ordinal,
         )
 
-        for key, group in iterator:
-            entries.append(CollectionGroup.create(list(group)))
-        if start_index is not None:
-            entries = entries[start_index:]
-        if count is not None:
-            entries = entries[:count]
-
-        return entries
+        groups = (CollectionGroup.create(list(group)) for _, group in iterator)
+        return _limit(groups, count=count, start_index=start_index)
 
     def _filter(
         self,
-        entries,
         count=None,
         leadtime=None,
         include_types=None,
@@ -93,37 +177,71 @@ class CollectionAggregator:
         include_today=False,
         start_index=None,
     ):
-        # remove unwanted waste types from include list
-        if include_types is not None:
-            entries = list(
-                filter(lambda e: e.type in set(include_types), self._entries)
-            )
+        entries = self._iter_upcoming(
+            leadtime=leadtime,
+            include_types=include_types,
+            exclude_types=exclude_types,
+            include_today=include_today,
+        )
+        return _limit(entries, count=count, start_index=start_index)
 
-        # remove unwanted waste types from exclude list
-        if exclude_types is not None:
-            entries = list(
-                filter(lambda e: e.type not in set(exclude_types), self._entries)
-            )
+    def _iter_upcoming(
+        self,
+        leadtime=None,
+        include_types=None,
+        exclude_types=None,
+        include_today=False,
+    ):
+        """Iterate over upcoming entries in date order."""
+        self._update_index()
+        entries, dates, include_types = self._select_index(include_types)
 
-        # remove expired entries
-        now = datetime.now().date()
+        # skip expired entries
+        now = datetime.now().date().toordinal()
         if include_today:
-            entries = list(filter(lambda e: e.date >= now, entries))
+            first = bisect_left(dates, now)
         else:
-            entries = list(filter(lambda e: e.date > now, entries))
+            first = bisect_right(dates, now)
 
-        # remove entries which are too far in the future (0 = today)
+        # skip entries which are too far in the future (0 = today)
+        last = len(dates)
         if leadtime is not None:
-            x = now + timedelta(days=leadtime)
-            entries = list(filter(lambda e: e.date <= x, entries))
+            last = bisect_right(dates, now + leadtime, lo=first)
+
+        iterator = (entries[i] for i in range(first, last))
+        return _filter_types(iterator, include_types, exclude_types)
+
+    def _select_index(self, include_types):
+        """Return entries, date ordinals and remaining include_types.
+
+        A single type can be looked up in its own index, so it doesn't need to
+        be filtered anymore.
+        """
+        if include_types is not None:
+            include_types = set(include_types)
+            if len(include_types) == 1:
+                (t,) = include_types
+                entries, dates = self._type_index.get(t, ([], []))
+                return entries, dates, None
+        return self._index, self._dates, include_types
+
+
+def _filter_types(iterator, include_types=None, exclude_types=None):
+    # remove unwanted waste types from include list
+    if include_types is not None:
+        include_types = set(include_types)
+        iterator = (e for e in iterator if e.type in include_types)
+
+    # remove unwanted waste types from exclude list
+    if exclude_types is not None:
+        exclude_types = set(exclude_types)
+        iterator = (e for e in iterator if e.type not in exclude_types)
 
-        # ensure that entries are sorted by date
-        entries.sort(key=lambda e: e.date)
+    return iterator
 
-        # remove surplus entries
-        if start_index is not None:
-            entries = entries[start_index:]
-        if count is not None:
-            entries = entries[:count]
 
-        return entries
+def _limit(iterator, count=None, start_index=None):
+    """Return list of items of iterator, skipping start_index, at most count."""
+    start = start_index or 0
+    stop = None if count is None else start + count
+    return list(itertools.islice(iterator, start, stop))
@@ -0,0 +1,427 @@
+"""HTTP client shared by all sources.
+
+Instances of Session use transport adapters which are shared by all
+sources. Therefore connections to the same host are kept alive and reused
+across fetches and sources, even if every source uses its own session (and
+therefore its own cookies).
+
+Requests to the same host are additionally limited by a token bucket and a
+maximum number of concurrent requests, see configure_host_limits().
+
+Within a refresh_cycle() block, identical requests of different sources share
+one network round-trip, see RequestCoalescer.
+
+track_requests() counts the requests of a thread, including requests which
+don't use Session, and records a span for every request. HTTPAdapter.send is
+only wrapped while a track_requests() block is active.
+"""
+
+import io
+import re
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# timeout in seconds which is used if a request doesn't specify one
+DEFAULT_TIMEOUT = 60
+
+# number of hosts with a connection pool, and connections per host
+POOL_HOSTS = 50
+POOL_MAXSIZE = 10
+
+_lock = threading.Lock()
+_adapters: dict[bool, "SharedHTTPAdapter"] = {}  # legacy_ssl -> adapter
+_limiters: dict[str, "HostLimiter"] = {}  # host -> limiter
+_coalescer = None  # RequestCoalescer of the current refresh cycle
+_local = threading.local()  # RequestStats of the current thread
+_wrapped_send = HTTPAdapter.send  # HTTPAdapter.send without the request hook
+_hook_users = 0  # number of active track_requests() blocks
+
+# request headers which don't affect the response, all other headers are part
+# of the key of identical requests
+_COALESCE_IGNORED_HEADERS = frozenset(("connection", "content-length"))
+
+# maximum number of spans recorded by one track_requests() block
+MAX_SPANS = 200
+
+# path segments which are replaced by {id} in the path template of a span
+_ID_SEGMENT = re.compile(r"\d+|[0-9a-fA-F-]{16,}")
+
+# limits per host, None = unlimited
+_requests_per_second = None
+_max_in_flight = None
+
+
+class HostLimiter:
+    """Token bucket and concurrency cap for the requests to one host."""
+
+    def __init__(self, requests_per_second=None, max_in_flight=None):
+        self._rate = requests_per_second
+        # allow a burst of up to one second worth of requests
+        self._capacity = max(1.0, requests_per_second or 0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._in_flight = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        )
+
+    def acquire(self):
+        """Block until a request can be sent."""
+        if self._in_flight is not None:
+            self._in_flight.acquire()
+        if self._rate:
+            time.sleep(self._reserve())
+
+    def release(self):
+        if self._in_flight is not None:
+            self._in_flight.release()
+
+    def _reserve(self):
+        """Take a token and return the time to wait until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # tokens may become negative, which queues the following requests
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+
+class _Call:
+    """Request which is in flight or completed within a refresh cycle."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.exception = None
+
+
+class RequestCoalescer:
+    """Share responses of identical requests.
+
+    The first request is sent, identical requests which are issued while it is
+    in flight wait for its response. Successful responses are also reused by
+    later identical requests until the coalescer is dropped. Responses which
+    set cookies are never shared, because the cookies belong to the session
+    of the source which sent the request. 304 responses are never shared,
+    because they are only valid for the cache of the sender. Only GET and HEAD
+    requests are shared, a POST may create state per request, e.g. the form
+    token of abfall_io.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+
+    def send(self, key, request, send):
+        """Return response for request, call send() if there is none yet."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            if call.response is not None:
+                return _copy_response(call.response, request)
+            # response of the leader can't be shared
+            return send()
+
+        try:
+            response = send()
+            if (
+                response.status_code < 400
+                and response.status_code != 304
+                and "set-cookie" not in response.headers
+            ):
+                response.content  # read the body now, it is shared
+                call.response = response
+        except Exception as exc:
+            call.exception = exc
+            raise
+        finally:
+            if call.response is None:
+                with self._lock:
+                    self._calls.pop(key, None)
+            call.done.set()
+
+        if call.response is None:
+            return response
+        return _copy_response(response, request)
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """Transport adapter with a connection pool per host and default timeout."""
+
+    def __init__(self, ssl_context=None, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(
+            pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, **kwargs
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.ssl_context is not None:
+            pool_kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        stats = getattr(_local, "stats", None)
+        if stats is None:
+            return self._send_shared(request, stream=stream, **kwargs)
+
+        # time which is not spent in HTTPAdapter.send is waiting time, e.g.
+        # for the host limiter or for the response of a coalesced request
+        start = time.perf_counter()
+        sent = stats.time
+        try:
+            return self._send_shared(request, stream=stream, **kwargs)
+        finally:
+            stats.wait += time.perf_counter() - start - (stats.time - sent)
+
+    def _send_shared(self, request, stream=False, **kwargs):
+        coalescer = _coalescer
+        if coalescer is not None and not stream:
+            key = _get_coalesce_key(request)
+            if key is not None:
+                return coalescer.send(
+                    key, request, lambda: self._send(request, stream=stream, **kwargs)
+                )
+        return self._send(request, stream=stream, **kwargs)
+
+    def _send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+        limiter = _get_limiter(urlsplit(request.url).hostname)
+        limiter.acquire()
+        try:
+            return super().send(request, timeout=timeout, **kwargs)
+        finally:
+            limiter.release()
+
+    def close(self):
+        # The adapter is shared by many sessions, so closing a session must not
+        # drop the pools of all other sessions.
+        pass
+
+
+class Session(requests.Session):
+    """Session which sends its requests through the shared adapters.
+
+    Keyword arguments:
+    legacy_ssl -- allow unsafe legacy TLS renegotiation for all hosts
+    legacy_ssl_hosts -- hosts for which legacy TLS renegotiation is allowed
+    """
+
+    def __init__(self, legacy_ssl=False, legacy_ssl_hosts=()):
+        super().__init__()
+        default = _get_adapter(legacy_ssl=False)
+        self.mount("http://", default)
+        self.mount("https://", _get_adapter(legacy_ssl=True) if legacy_ssl else default)
+        for host in legacy_ssl_hosts:
+            self.mount(f"https://{host}/", _get_adapter(legacy_ssl=True))
+
+
+def configure_host_limits(requests_per_second=None, max_in_flight=None):
+    """Limit the requests which are sent to the same host.
+
+    Keyword arguments:
+    requests_per_second -- average rate of requests, None = unlimited
+    max_in_flight -- number of concurrent requests, None = unlimited
+    """
+    global _requests_per_second, _max_in_flight
+    with _lock:
+        _requests_per_second = requests_per_second or None
+        _max_in_flight = max_in_flight or None
+        _limiters.clear()
+
+
+def _get_limiter(host):
+    with _lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(
+                _requests_per_second, _max_in_flight
+            )
+        return limiter
+
+
+@contextmanager
+def refresh_cycle():
+    """Share responses of identical requests sent within the block.
+
+    Nested blocks, e.g. of overlapping refreshes, join the outer cycle.
+    """
+    global _coalescer
+    with _lock:
+        owner = _coalescer is None
+        if owner:
+            _coalescer = RequestCoalescer()
+    try:
+        yield
+    finally:
+        if owner:
+            with _lock:
+                _coalescer = None
+
+
+class RequestStats:
+    """Requests sent within a track_requests() block.
+
+    spans contains one dict per request with method, host, path (with IDs
+    replaced by {id}), status, bytes, start (epoch seconds), latency
+    (seconds) and error (exception class name).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.bytes = 0  # size of the response bodies
+        self.time = 0.0  # seconds spent sending requests and reading responses
+        self.wait = 0.0  # seconds spent waiting for host limits or other sources
+        self.spans = []
+
+
+@contextmanager
+def track_requests(stats):
+    """Count all requests sent by the current thread within the block.
+
+    HTTPAdapter.send is wrapped until the last active block ends, requests of
+    other threads pass the wrapper unchanged.
+    """
+    _install_request_hook()
+    previous = getattr(_local, "stats", None)
+    _local.stats = stats
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
+        _remove_request_hook()
+
+
+def _install_request_hook():
+    global _wrapped_send, _hook_users
+    with _lock:
+        if _hook_users == 0 and HTTPAdapter.send is not _tracking_send:
+            _wrapped_send = HTTPAdapter.send
+            HTTPAdapter.send = _tracking_send  # type: ignore[method-assign]
+        _hook_users += 1
+
+
+def _remove_request_hook():
+    global _hook_users
+    with _lock:
+        _hook_users -= 1
+        # leave it alone if somebody else has wrapped it in the meantime
+        if _hook_users == 0 and HTTPAdapter.send is _tracking_send:
+            HTTPAdapter.send = _wrapped_send  # type: ignore[method-assign]
+
+
+def _tracking_send(self, request, **kwargs):
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        return _wrapped_send(self, request, **kwargs)
+
+    span = {"method": request.method, "status": None, "bytes": 0, "error": None}
+    span["start"] = time.time()
+    start = time.perf_counter()
+    try:
+        response = _wrapped_send(self, request, **kwargs)
+        span["status"] = response.status_code
+        if kwargs.get("stream"):
+            length = response.headers.get("Content-Length", "")
+            span["bytes"] = int(length) if length.isdigit() else 0
+        else:
+            # read by requests.Session.send anyway
+            span["bytes"] = len(response.content)
+        return response
+    except Exception as exc:
+        span["error"] = type(exc).__name__
+        raise
+    finally:
+        span["latency"] = time.perf_counter() - start
+        stats.requests += 1
+        stats.bytes += span["bytes"]
+        stats.time += span["latency"]
+        if len(stats.spans) < MAX_SPANS:
+            url = urlsplit(request.url)
+            span["host"] = url.hostname
+            span["path"] = get_path_template(url.path)
+            stats.spans.append(span)
+
+
+def get_path_template(path):
+    """Return path with numeric and hex IDs replaced by {id}.
+
+    Requests which only differ in an ID get the same template, e.g.
+    /rest/orte/1000/strassen -> /rest/orte/{id}/strassen.
+    """
+    return "/".join(
+        "{id}" if _ID_SEGMENT.fullmatch(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+def _get_coalesce_key(request):
+    """Return key of identical requests, None if request can't be shared."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    body = request.body
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif body is not None and not isinstance(body, bytes):
+        return None  # streamed upload
+    # e.g. If-None-Match, Cookie, Authorization, API keys, Accept, Referer
+    headers = tuple(
+        sorted(
+            (k.lower(), v)
+            for k, v in request.headers.items()
+            if k.lower() not in _COALESCE_IGNORED_HEADERS
+        )
+    )
+    return (request.method, request.url, body, headers)
+
+
+def _copy_response(response, request):
+    """Return copy of a completed response for another request."""
+    r = requests.Response()
+    r.status_code = response.status_code
+    r.reason = response.reason
+    r.headers = CaseInsensitiveDict(response.headers)
+    r.encoding = response.encoding
+    r.url = response.url
+    r.elapsed = response.elapsed
+    r.request = request
+    r.connection = response.connection
+    r._content = response._content
+    r._content_consumed = True
+    r.raw = io.BytesIO(r._content)
+    return r
+
+
+def _get_adapter(legacy_ssl):
+    with _lock:
+        adapter = _adapters.get(legacy_ssl)
+        if adapter is None:
+            ssl_context = _create_legacy_ssl_context() if legacy_ssl else None
+            adapter = _adapters[legacy_ssl] = SharedHTTPAdapter(ssl_context)
+        return adapter
+
+
+def _create_legacy_ssl_context():
+    # Work around SSL UNSAFE_LEGACY_RENEGOTIATION_DISABLED errors, see
+    # https://stackoverflow.com/questions/71603314/ssl-error-unsafe-legacy-renegotiation-disabled
+    ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
+    return ctx
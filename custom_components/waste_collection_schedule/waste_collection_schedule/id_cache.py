@@ -0,0 +1,119 @@
+"""Persistent cache for IDs which are resolved from human-readable addresses.
+
+Many services need several requests to translate a city, street and house
+number into the ID which is required to request the collection dates. The
+resolved IDs rarely change, so they are cached for ID_CACHE_TTL. A source must
+invalidate its entry if the server rejects the cached IDs or returns no dates
+for them, so the IDs are resolved again. Transient errors must not invalidate
+the entry, see is_lookup_failure().
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+
+# seconds after which IDs are resolved again
+ID_CACHE_TTL = 7 * 24 * 3600
+
+
+class IdCache:
+    """Resolved IDs per namespace and key, optionally stored in a JSON file.
+
+    The file is loaded on first access, so creating the cache doesn't block.
+    Without path, the cache lives in memory only.
+    """
+
+    def __init__(self, path=None, ttl=ID_CACHE_TTL):
+        self._path = path
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._data = None  # namespace -> key -> [timestamp, value]
+
+    def get(self, namespace, key):
+        """Return cached value for key, None if missing or expired."""
+        with self._lock:
+            item = self._load().get(namespace, {}).get(_encode_key(key))
+        if item is None or time.time() - item[0] > self._ttl:
+            return None
+        return item[1]
+
+    def set(self, namespace, key, value):
+        """Store value for key, value must be JSON serializable."""
+        with self._lock:
+            self._load().setdefault(namespace, {})[_encode_key(key)] = [
+                time.time(),
+                value,
+            ]
+            self._save()
+
+    def invalidate(self, namespace, key):
+        with self._lock:
+            if self._load().get(namespace, {}).pop(_encode_key(key), None):
+                self._save()
+
+    def _load(self):
+        if self._data is None:
+            self._data = {}
+            if self._path is not None:
+                try:
+                    with open(self._path) as f:
+                        self._data = json.load(f)
+                except FileNotFoundError:
+                    pass
+                except (OSError, ValueError) as exc:
+                    _LOGGER.warning(f"ignoring invalid id cache {self._path}: {exc}")
+            self._expire()
+        return self._data
+
+    def _expire(self):
+        now = time.time()
+        for items in self._data.values():
+            for key in [k for k, v in items.items() if now - v[0] > self._ttl]:
+                del items[key]
+
+    def _save(self):
+        if self._path is None:
+            return
+        tmp = f"{self._path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self._data, f, separators=(",", ":"))
+            os.replace(tmp, self._path)
+        except OSError as exc:
+            _LOGGER.warning(f"failed to store id cache {self._path}: {exc}")
+
+
+def is_lookup_failure(exc):
+    """Return True if a request failed because the server doesn't know the IDs.
+
+    Only client errors count. Connection errors, timeouts, rate limits and
+    server errors are transient, the cached IDs are still valid.
+    """
+    if not isinstance(exc, requests.exceptions.HTTPError) or exc.response is None:
+        return False
+    status = exc.response.status_code
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+def _encode_key(key):
+    return json.dumps(key, separators=(",", ":"))
+
+
+_id_cache = IdCache()
+
+
+def configure_id_cache(path=None, ttl=ID_CACHE_TTL):
+    """Replace the cache which is shared by all sources."""
+    global _id_cache
+    _id_cache = IdCache(path=path, ttl=ttl)
+
+
+def get_id_cache():
+    """Return the cache which is shared by all sources."""
+    return _id_cache
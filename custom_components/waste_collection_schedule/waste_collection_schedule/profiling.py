@@ -0,0 +1,219 @@
+"""Profile fetches of single sources.
+
+A FetchProfile runs the fetch of one source under cProfile and splits the
+time into categories like network wait and parsing, based on the module of the
+functions which have been running. The customize pass is profiled separately.
+
+trace_events() exports the requests of the last fetches as trace file.
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import time
+from contextlib import contextmanager
+
+# number of functions listed per source, sorted by cumulative time
+PROFILE_TOP_FUNCTIONS = 20
+
+# category -> patterns matched against file name and function name of the
+# profiled functions, the first matching category wins
+CATEGORIES = (
+    (
+        "wait",
+        (
+            r"\btime\.sleep\b",
+            r"'acquire' of '_thread\.",
+            r"[/\\]threading\.py:",
+        ),
+    ),
+    (
+        "network",
+        (
+            r"[/\\](requests|urllib3|certifi|charset_normalizer|idna)[/\\]",
+            r"[/\\]http[/\\]client\.py:",
+            r"[/\\](socket|ssl|selectors)\.py:",
+            r"_socket\.|_ssl\.|select\.",
+            r"[/\\]http_client\.py:",
+        ),
+    ),
+    ("import", (r"<frozen importlib\.", r"\bbuiltins\.__import__\b")),
+    (
+        "html",
+        (
+            r"[/\\](bs4|lxml|html5lib|soupsieve)[/\\]",
+            r"[/\\]html[/\\]parser\.py:",
+            r"lxml\.",
+        ),
+    ),
+    (
+        "ics",
+        (
+            r"[/\\](icalendar|icalevents|recurring_ical_events|x_wr_timezone)[/\\]",
+            r"[/\\]service[/\\]ICS(_v1|_v3)?\.py:",
+        ),
+    ),
+    ("json", (r"[/\\]json[/\\]", r"_json\.")),
+    (
+        "dates",
+        (
+            r"[/\\](dateutil|pytz|zoneinfo)[/\\]",
+            r"[/\\]_strptime\.py:",
+            r"\bstrptime\b|\bfromisoformat\b",
+        ),
+    ),
+)
+
+_CATEGORY_RE = [(name, re.compile("|".join(patterns))) for name, patterns in CATEGORIES]
+
+
+def categorize(function):
+    """Return category of a pstats function key (file, line, name)."""
+    filename, line, name = function
+    label = f"{filename}:{line}:{name}"
+    for category, regex in _CATEGORY_RE:
+        if regex.search(label):
+            return category
+    return "source"
+
+
+class FetchProfile:
+    """Profile of the fetch of one source."""
+
+    def __init__(self):
+        self._fetch = cProfile.Profile()
+        self._customize = cProfile.Profile()
+        self.fetch_time = 0.0
+        self.customize_time = 0.0
+        self.complete = True  # False if the fetch didn't finish in time
+
+    @contextmanager
+    def fetch(self):
+        """Profile the fetch, must be entered by the thread which fetches."""
+        start = time.perf_counter()
+        self._fetch.enable()
+        try:
+            yield
+        finally:
+            self._fetch.disable()
+            self.fetch_time += time.perf_counter() - start
+
+    @contextmanager
+    def customize(self):
+        """Profile the customize pass of the fetched entries."""
+        start = time.perf_counter()
+        self._customize.enable()
+        try:
+            yield
+        finally:
+            self._customize.disable()
+            self.customize_time += time.perf_counter() - start
+
+    def breakdown(self):
+        """Return dict of category -> seconds.
+
+        The fetch time is split by the exclusive time of its functions,
+        "other" is the time which has not been recorded by the profiler.
+        """
+        result = {category: 0.0 for category, _ in CATEGORIES}
+        result["source"] = 0.0
+        if self.fetch_time > 0:
+            stats = pstats.Stats(self._fetch)
+            for function, (_, _, tottime, _, _) in stats.stats.items():
+                result[categorize(function)] += tottime
+        result["other"] = max(0.0, self.fetch_time - sum(result.values()))
+        result["customize"] = self.customize_time
+        return result
+
+    def format_stats(self, count=PROFILE_TOP_FUNCTIONS):
+        """Return the functions with the highest cumulative time as text."""
+        out = io.StringIO()
+        stats = pstats.Stats(stream=out)
+        for profile, elapsed in (
+            (self._fetch, self.fetch_time),
+            (self._customize, self.customize_time),
+        ):
+            if elapsed > 0:
+                stats.add(profile)
+        if not stats.stats:
+            return ""
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(count)
+        return out.getvalue()
+
+
+def format_report(profiles):
+    """Return report of a list of (title, FetchProfile) as text."""
+    lines = []
+    for title, profile in profiles:
+        lines.append(f"{title}: {profile.fetch_time:.3f} s fetch")
+        if not profile.complete:
+            lines.append("  fetch timed out, the profile is incomplete")
+            lines.append("")
+            continue
+        for category, seconds in profile.breakdown().items():
+            lines.append(f"  {category:<10} {seconds:8.3f} s")
+        lines.append("")
+
+    for title, profile in profiles:
+        if profile.complete:
+            lines.append(f"=== {title} ===")
+            lines.append(profile.format_stats())
+    return "\n".join(lines)
+
+
+def trace_events(fetches):
+    """Return the last fetches in the Chrome trace event format.
+
+    fetches is a list of (title, FetchMetrics). Every source gets its own
+    track with its fetch and the requests of the fetch as nested spans. The
+    result can be viewed with chrome://tracing or https://ui.perfetto.dev.
+    """
+    events = []
+    for tid, (title, metrics) in enumerate(fetches):
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 0,
+                "tid": tid,
+                "args": {"name": title},
+            }
+        )
+        if metrics.started is None:
+            continue
+        events.append(
+            {
+                "name": "fetch",
+                "cat": "fetch",
+                "ph": "X",
+                "pid": 0,
+                "tid": tid,
+                "ts": metrics.started * 1e6,
+                "dur": metrics.duration * 1e6,
+                "args": {
+                    "entries": metrics.entries,
+                    "error": metrics.last_error
+                    if metrics.consecutive_failures
+                    else None,
+                },
+            }
+        )
+        for span in metrics.spans:
+            events.append(
+                {
+                    "name": f"{span['method']} {span['host']}{span['path']}",
+                    "cat": "request",
+                    "ph": "X",
+                    "pid": 0,
+                    "tid": tid,
+                    "ts": span["start"] * 1e6,
+                    "dur": span["latency"] * 1e6,
+                    "args": {
+                        "status": span["status"],
+                        "bytes": span["bytes"],
+                        "error": span["error"],
+                    },
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
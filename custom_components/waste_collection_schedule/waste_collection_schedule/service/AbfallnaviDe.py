@@ -4,6 +4,8 @@ import json
 from datetime import datetime
 
 import requests
+from waste_collection_schedule.http_client import Session
+from waste_collection_schedule.id_cache import get_id_cache, is_lookup_failure
 
 SERVICE_DOMAINS = [
     {
@@ -146,13 +148,15 @@ class AbfallnaviDe:
         self._service_url_fallback = (
             f"https://abfallapp.regioit.de/abfall-app-{service_domain}/rest"
         )
+        self._session = Session()
 
     def _fetch(self, path, params=None):
         try:
-            r = requests.get(f"{self._service_url}/{path}", params=params)
+            r = self._session.get(f"{self._service_url}/{path}", params=params)
         except requests.exceptions.ConnectionError:
             self._service_url = self._service_url_fallback
-            r = requests.get(f"{self._service_url}/{path}", params=params)
+            r = self._session.get(f"{self._service_url}/{path}", params=params)
+        r.raise_for_status()
         r.encoding = "utf-8"  # requests doesn't guess the encoding correctly
         return r.text
 
@@ -235,7 +239,32 @@ class AbfallnaviDe:
         return self._get_dates("hausnummern", house_number_id, waste_types=None)
 
     def get_dates(self, city, street, house_number=None):
-        """Get dates by strings only for convenience."""
+        """Get dates by strings only for convenience.
+
+        The resolved ids are cached, so usually only the dates are requested.
+        """
+        id_cache = get_id_cache()
+        key = [self._service_domain, city, street, house_number]
+        targets = id_cache.get("abfallnavi_de", key)
+        if targets is not None:
+            try:
+                dates = self._get_dates_by_targets(targets)
+            except requests.exceptions.HTTPError as exc:
+                if not is_lookup_failure(exc):
+                    raise
+                dates = []
+            if dates:
+                return dates
+            # ids may change, e.g. on year change
+            id_cache.invalidate("abfallnavi_de", key)
+
+        targets = self._resolve_targets(city, street, house_number)
+        dates = self._get_dates_by_targets(targets)
+        id_cache.set("abfallnavi_de", key, targets)
+        return dates
+
+    def _resolve_targets(self, city, street, house_number=None):
+        """Return list of [target, id] to request the dates for."""
         # find city_id
         city_id = self.get_city_id(city)
         if city_id is None:
@@ -246,7 +275,7 @@ class AbfallnaviDe:
         if street_ids == []:
             raise Exception(f"No id found for street: {street}")
 
-        dates = []
+        targets = []
         for street_id in street_ids:
             # find house_number_id (which is optional: not all house number do have an id)
             house_number_id = self.get_house_number_id(street_id, house_number)
@@ -254,9 +283,16 @@ class AbfallnaviDe:
             # return dates for specific house number of street if house number
             # doesn't have an own id
             if house_number_id is not None:
-                dates += self.get_dates_by_house_number_id(house_number_id)
+                targets.append(["hausnummern", house_number_id])
             else:
-                dates += self.get_dates_by_street_id(street_id)
+                targets.append(["strassen", street_id])
+        return targets
+
+    def _get_dates_by_targets(self, targets):
+        waste_types = self.get_waste_types()
+        dates = []
+        for target, id in targets:
+            dates += self._get_dates(target, id, waste_types=waste_types)
         return dates
 
     def _find_in_inverted_dict(self, mydict, value):
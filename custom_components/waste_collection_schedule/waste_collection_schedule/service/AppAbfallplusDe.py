@@ -6,6 +6,8 @@ from datetime import date, datetime
 
 import requests
 from bs4 import BeautifulSoup, Tag
+from waste_collection_schedule.id_cache import get_id_cache
+from waste_collection_schedule.source_shell import is_transient_error
 
 SUPPORTED_APPS = [
     "de.albagroup.app",
@@ -250,6 +252,10 @@ def random_hex(length: int = 1) -> str:
     return "".join(random.choice("0123456789abcdef") for _ in range(length))
 
 
+def random_client_id() -> str:
+    return "-".join(random_hex(n) for n in (8, 4, 4, 4, 12))
+
+
 API_BASE = "https://app.abfallplus.de/{}"
 API_ASSISTANT = API_BASE.format("assistent/{}")  # ignore: E501
 
@@ -306,17 +312,7 @@ class AppAbfallplusDe:
         strasse_id=None,
         hnr_id=None,
     ):
-        self._client = (
-            random_hex(8)
-            + "-"
-            + random_hex(4)
-            + "-"
-            + random_hex(4)
-            + "-"
-            + random_hex(4)
-            + "-"
-            + random_hex(12)
-        )
+        self._client = random_client_id()
         self._app_id = app_id
         self._session = requests.Session()
         self._bundesland_search = bundesland
@@ -333,6 +329,24 @@ class AppAbfallplusDe:
         self._bezirk_id = bezirk_id
         self._strasse_id = strasse_id
 
+        # the ids above change while the assistant runs, so the key of the
+        # cached client is built from the arguments
+        self._cache_key = [
+            app_id,
+            bundesland,
+            landkreis,
+            kommune,
+            bezirk,
+            strasse,
+            hnr,
+            bundesland_id,
+            landkreis_id,
+            kommune_id,
+            bezirk_id,
+            strasse_id,
+            hnr_id,
+        ]
+
         self._needs_subtitle: list[str] = []
 
     def _request(
@@ -705,12 +719,14 @@ class AppAbfallplusDe:
             base=API_BASE,
             data={"client": self._client, "app_id": self._app_id},
         )
+        r.raise_for_status()
         r = self._request(
             "version.xml",
             params={"renew": 1},
             base=API_BASE,
             data={"client": self._client, "app_id": self._app_id},
         )
+        r.raise_for_status()
         r = self._request(
             "struktur.xml.zip",
             base=API_BASE,
@@ -774,9 +790,41 @@ class AppAbfallplusDe:
     def generate_calendar(self) -> list[dict[str, date | str]]:
         """Run all necessary function and return the output of get_collections.
 
+        The server remembers the selected address per client, so the client
+        is cached and the assistant only runs if the cached client fails.
+
         Returns:
             list[dict[str, date|str]]: all collection dates
         """
+        id_cache = get_id_cache()
+        key = self._cache_key
+        cached = id_cache.get("app_abfallplus_de", key)
+        if cached is not None:
+            self._client = cached["client"]
+            self._needs_subtitle = cached["needs_subtitle"]
+            try:
+                collections = self.get_collections()
+            except Exception as exc:
+                # the server may have forgotten the client, which shows up as
+                # a client error or as a response which can't be parsed
+                if is_transient_error(exc):
+                    raise
+                collections = []
+            if collections:
+                return collections
+            id_cache.invalidate("app_abfallplus_de", key)
+            self._client = random_client_id()
+            self._needs_subtitle = []
+
+        collections = self._run_assistant()
+        id_cache.set(
+            "app_abfallplus_de",
+            key,
+            {"client": self._client, "needs_subtitle": self._needs_subtitle},
+        )
+        return collections
+
+    def _run_assistant(self) -> list[dict[str, date | str]]:
         self.init_connection()
         if self._bundesland_search:
             self.select_bundesland()
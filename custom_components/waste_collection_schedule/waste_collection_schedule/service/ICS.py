@@ -1,13 +1,25 @@
 import datetime
+import functools
 import logging
 import re
-from typing import Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
-import jinja2
-from icalevents import icalevents
+if TYPE_CHECKING:
+    import jinja2
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_TITLE_TEMPLATE = "{{date.summary}}"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_title_template(title_template: str) -> "jinja2.Template":
+    """Compile title template, shared by all instances using the same text."""
+    # imported on demand, most sources use the default template
+    import jinja2
+
+    return jinja2.Environment().from_string(title_template)
+
 
 class ICS:
     def __init__(
@@ -15,7 +27,7 @@ class ICS:
         offset: Optional[int] = None,
         regex: Optional[str] = None,
         split_at: Optional[str] = None,
-        title_template: str = "{{date.summary}}",
+        title_template: str = DEFAULT_TITLE_TEMPLATE,
     ):
         self._offset = offset
         self._regex = None
@@ -27,9 +39,15 @@ class ICS:
         if split_at is not None:
             self._split_at = re.compile(split_at)
 
-        self._title_template = title_template
+        # the default template doesn't need jinja2 at all
+        self._title_template: Optional["jinja2.Template"] = None
+        if title_template != DEFAULT_TITLE_TEMPLATE:
+            self._title_template = compile_title_template(title_template)
 
     def convert(self, ics_data: str) -> List[Tuple[datetime.date, str]]:
+        # imported on first use, it takes longer to import than most sources
+        from icalevents import icalevents
+
         # calculate start- and end-date for recurring events
         start_date = datetime.datetime.now().replace(
             hour=0, minute=0, second=0, microsecond=0
@@ -65,9 +83,10 @@ class ICS:
                 if self._offset is not None:
                     dtstart += datetime.timedelta(days=self._offset)
 
-                environment = jinja2.Environment()
-                title_template = environment.from_string(self._title_template)
-                entry_title = title_template.render(date=e)
+                if self._title_template is None:
+                    entry_title = str(e.summary)
+                else:
+                    entry_title = self._title_template.render(date=e)
 
                 if self._regex is not None:
                     match = self._regex.match(entry_title)
@@ -2,10 +2,7 @@ import datetime
 import logging
 import re
 
-import icalendar
-import recurring_ical_events
-import jinja2
-
+from .ICS import DEFAULT_TITLE_TEMPLATE, compile_title_template
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,7 +13,7 @@ class ICS_v1:
         offset=None,
         regex=None,
         split_at=None,
-        title_template="{{date.summary}}",
+        title_template=DEFAULT_TITLE_TEMPLATE,
     ):
         self._offset = offset
         self._regex = None
@@ -24,9 +21,16 @@ class ICS_v1:
             self._regex = re.compile(regex)
         self._split_at = split_at
 
-        self._title_template = title_template
+        # the default template doesn't need jinja2 at all
+        self._title_template = None
+        if title_template != DEFAULT_TITLE_TEMPLATE:
+            self._title_template = compile_title_template(title_template)
 
     def convert(self, ics_data):
+        # imported on first use, they take longer to import than most sources
+        import icalendar
+        import recurring_ical_events
+
         # parse ics file
         calendar = icalendar.Calendar.from_ical(ics_data)
 
@@ -53,9 +57,10 @@ class ICS_v1:
                     dtstart += datetime.timedelta(days=self._offset)
 
                 # calculate waste type
-                environment = jinja2.Environment()
-                title_template = environment.from_string(self._title_template)
-                entry_title = title_template.render(date=e)
+                if self._title_template is None:
+                    entry_title = _summary(e)
+                else:
+                    entry_title = self._title_template.render(date=e)
 
                 if self._regex is not None:
                     match = self._regex.match(entry_title)
@@ -70,3 +75,13 @@ class ICS_v1:
                     entries.append((dtstart, entry_title))
 
         return entries
+
+
+def _summary(e):
+    """Return the same text as rendering the default title template."""
+    try:
+        value = e.summary
+    except AttributeError:
+        # jinja2 falls back to item lookup, older icalendar has no attribute
+        value = e.get("summary", "")
+    return str(value)
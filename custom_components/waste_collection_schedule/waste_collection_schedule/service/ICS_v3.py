@@ -0,0 +1,260 @@
+import datetime
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .ICS import DEFAULT_TITLE_TEMPLATE, compile_title_template
+
+_LOGGER = logging.getLogger(__name__)
+
+# properties of a VEVENT which are needed to calculate the collection dates
+DATE_PROPERTIES = {"DTSTART", "RRULE", "EXDATE", "RDATE", "UID", "RECURRENCE-ID"}
+
+# additional properties which are only kept for custom title templates
+TEMPLATE_PROPERTIES = {"SUMMARY", "DESCRIPTION", "LOCATION", "CATEGORIES"}
+
+TEXT_ESCAPES = re.compile(r"\\([\\;,nN])")
+UNTIL_UTC = re.compile(r"(UNTIL=\d{8}T\d{6})Z")
+UNTIL_DATE = re.compile(r"(UNTIL=\d{8})(?=;|$)")
+
+
+class Event:
+    """Subset of a VEVENT, available as `date` in the title template."""
+
+    __slots__ = ("start", "summary", "description", "location", "categories", "uid")
+
+    def __init__(self, start, properties):
+        self.start = start
+        self.summary = properties.get("SUMMARY")
+        self.description = properties.get("DESCRIPTION")
+        self.location = properties.get("LOCATION")
+        self.categories = properties.get("CATEGORIES")
+        self.uid = properties.get("UID")
+
+
+class ICS_v3:
+    """Streaming ICS parser.
+
+    Only the properties needed to calculate the collection dates are kept per
+    VEVENT and recurring events are expanded lazily within the requested window,
+    so the calendar is never held in memory as a whole.
+    """
+
+    def __init__(
+        self,
+        offset: Optional[int] = None,
+        regex: Optional[str] = None,
+        split_at: Optional[str] = None,
+        title_template: str = DEFAULT_TITLE_TEMPLATE,
+    ):
+        self._offset = offset
+        self._regex = None
+        self._split_at = None
+
+        if regex is not None:
+            self._regex = re.compile(regex)
+
+        if split_at is not None:
+            self._split_at = re.compile(split_at)
+
+        # the default template doesn't need jinja2 at all
+        self._title_template = None
+        self._properties = DATE_PROPERTIES | {"SUMMARY"}
+        if title_template != DEFAULT_TITLE_TEMPLATE:
+            self._title_template = compile_title_template(title_template)
+            self._properties = DATE_PROPERTIES | TEMPLATE_PROPERTIES
+
+    def convert(
+        self,
+        ics_data: str,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+    ) -> List[Tuple[datetime.date, str]]:
+        # calculate start- and end-date for recurring events
+        if start_date is None:
+            start_date = datetime.date.today()
+            if self._offset is not None:
+                start_date -= datetime.timedelta(days=self._offset)
+        if end_date is None:
+            end_date = start_date + datetime.timedelta(days=365)
+
+        entries: List[Tuple[datetime.date, str]] = []
+
+        # recurring events are expanded at the end, because modified instances
+        # (RECURRENCE-ID) may follow after the recurring event
+        recurring: List[Dict[str, list]] = []
+        overridden: Set[Tuple[Optional[str], datetime.date]] = set()
+
+        for properties in self._vevents(ics_data):
+            if "DTSTART" not in properties:
+                continue
+            if "RECURRENCE-ID" in properties:
+                overridden.add(
+                    (
+                        _value(properties, "UID"),
+                        _parse_date(properties["RECURRENCE-ID"][0][1]),
+                    )
+                )
+            if "RRULE" in properties or "RDATE" in properties:
+                recurring.append(properties)
+                continue
+
+            dtstart = _parse_date(properties["DTSTART"][0][1])
+            if start_date <= dtstart <= end_date:
+                self._add_entries(entries, dtstart, properties)
+
+        for properties in recurring:
+            uid = _value(properties, "UID")
+            for dtstart in _expand(properties, start_date, end_date):
+                if (uid, dtstart) not in overridden:
+                    self._add_entries(entries, dtstart, properties)
+
+        entries.sort(key=lambda e: e[0])
+        return entries
+
+    def _vevents(self, ics_data: str) -> Iterator[Dict[str, list]]:
+        """Yield the wanted properties of all VEVENT's.
+
+        Every property maps to a list of (parameters, value) tuples.
+        """
+        properties: Optional[Dict[str, list]] = None
+        nested = 0  # depth of components within a VEVENT, e.g. VALARM
+
+        for line in _unfold(ics_data):
+            name, params, value = _split(line)
+            if name == "BEGIN":
+                if properties is not None:
+                    nested += 1
+                elif value.upper() == "VEVENT":
+                    properties = {}
+            elif name == "END":
+                if nested > 0:
+                    nested -= 1
+                elif properties is not None and value.upper() == "VEVENT":
+                    yield properties
+                    properties = None
+            elif properties is not None and nested == 0 and name in self._properties:
+                properties.setdefault(name, []).append((params, value))
+
+    def _add_entries(self, entries, dtstart, properties):
+        if self._offset is not None:
+            dtstart += datetime.timedelta(days=self._offset)
+
+        summary = _text(_value(properties, "SUMMARY"))
+        if self._title_template is None:
+            entry_title = str(summary)
+        else:
+            event = Event(
+                dtstart,
+                {
+                    name: _text(_value(properties, name))
+                    for name in TEMPLATE_PROPERTIES | {"UID"}
+                },
+            )
+            entry_title = self._title_template.render(date=event)
+
+        if self._regex is not None:
+            match = self._regex.match(entry_title)
+            if match:
+                entry_title = match.group(1)
+
+        if self._split_at is not None:
+            entry_title_list = re.split(self._split_at, entry_title)
+            entries.extend((dtstart, t.strip().title()) for t in entry_title_list)
+        else:
+            entries.append((dtstart, entry_title))
+
+
+def _unfold(ics_data: str) -> Iterator[str]:
+    """Yield content lines, joining folded lines."""
+    current = None
+    for line in ics_data.splitlines():
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line.lstrip("\ufeff")
+    if current is not None:
+        yield current
+
+
+def _split(line: str) -> Tuple[str, str, str]:
+    """Split content line into name, parameters and value."""
+    i = line.find(":")
+    if i >= 0 and '"' not in line[:i]:
+        name, _, params = line[:i].partition(";")
+        return name.upper(), params, line[i + 1 :]
+
+    # quoted parameter values may contain colons
+    in_quotes = False
+    for i, c in enumerate(line):
+        if c == '"':
+            in_quotes = not in_quotes
+        elif c == ":" and not in_quotes:
+            name, _, params = line[:i].partition(";")
+            return name.upper(), params, line[i + 1 :]
+    return line.upper(), "", ""
+
+
+def _value(properties, name) -> Optional[str]:
+    values = properties.get(name)
+    return values[0][1] if values else None
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return TEXT_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _parse_date(value: str) -> datetime.date:
+    """Return date of a DATE or DATE-TIME value, in the time zone of the value."""
+    return datetime.date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def _parse_datetime(value: str) -> datetime.datetime:
+    d = _parse_date(value)
+    if len(value) >= 15 and value[8] == "T":
+        return datetime.datetime(
+            d.year, d.month, d.day, int(value[9:11]), int(value[11:13])
+        )
+    return datetime.datetime(d.year, d.month, d.day)
+
+
+def _expand(properties, start_date, end_date) -> Iterator[datetime.date]:
+    """Yield dates of a recurring event within [start_date, end_date]."""
+    # only needed for recurring events
+    from dateutil import rrule
+
+    dtstart = _parse_datetime(properties["DTSTART"][0][1])
+
+    rules = rrule.rruleset()
+    for _, value in properties.get("RRULE", []):
+        # dates are calculated in the time zone of DTSTART, which is naive here
+        value = UNTIL_UTC.sub(r"\1", value)
+        value = UNTIL_DATE.sub(r"\1T235959", value)
+        try:
+            rules.rrule(rrule.rrulestr(value, dtstart=dtstart))  # type: ignore[arg-type]
+        except ValueError as e:
+            _LOGGER.warning(f"ignoring invalid RRULE {value}: {e}")
+    if "RRULE" not in properties:
+        # RDATE without RRULE: DTSTART is the first occurrence
+        rules.rdate(dtstart)
+    excluded = {
+        _parse_date(v)
+        for _, value in properties.get("EXDATE", [])
+        for v in value.split(",")
+    }
+    for _, value in properties.get("RDATE", []):
+        for v in value.split(","):
+            rules.rdate(_parse_datetime(v.split("/")[0]))
+
+    after = datetime.datetime.combine(start_date, datetime.time.min)
+    before = datetime.datetime.combine(end_date, datetime.time.max)
+    for occurrence in rules.xafter(after, inc=True):
+        if occurrence > before:
+            break
+        if occurrence.date() not in excluded:
+            yield occurrence.date()
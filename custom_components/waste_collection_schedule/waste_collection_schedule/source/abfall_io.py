@@ -3,8 +3,8 @@ import logging
 import re
 from html.parser import HTMLParser
 
-import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
+from waste_collection_schedule.http_client import Session
 from waste_collection_schedule.service.AbfallIO import SERVICE_MAP
 from waste_collection_schedule.service.ICS import ICS
 
@@ -112,12 +112,13 @@ class Source:
         self._strasse_hnr = f_id_strasse_hnr
         self._abfallarten = f_abfallarten  # list of integers
         self._ics = ICS()
+        self._session = Session()
 
     def fetch(self):
         # get token
         params = {"key": self._key, "modus": MODUS_KEY, "waction": "init"}
 
-        r = requests.post("https://api.abfall.io", params=params, headers=HEADERS)
+        r = self._session.post("https://api.abfall.io", params=params, headers=HEADERS)
 
         # add all hidden input fields to form data
         # There is one hidden field which acts as a token:
@@ -148,7 +149,7 @@ class Source:
         params = {"key": self._key, "modus": MODUS_KEY, "waction": "export_ics"}
 
         # get csv file
-        r = requests.post(
+        r = self._session.post(
             "https://api.abfall.io", params=params, data=args, headers=HEADERS
         )
 
@@ -1,13 +1,15 @@
 import datetime
+import hashlib
 import logging
 import re
 from os import getcwd
 from pathlib import Path
 
-import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
+from waste_collection_schedule.http_client import Session
 from waste_collection_schedule.service.ICS import ICS
 from waste_collection_schedule.service.ICS_v1 import ICS_v1
+from waste_collection_schedule.service.ICS_v3 import ICS_v3
 
 TITLE = "ICS"
 DESCRIPTION = "Source for ICS based schedules."
@@ -104,6 +106,10 @@ TEST_CASES = {
 HEADERS = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 _LOGGER = logging.getLogger(__name__)
 
+# Reuse the converted dates of an unchanged ICS file at most this long, because
+# recurring events are only expanded within a window relative to today.
+CONVERT_MAX_AGE = datetime.timedelta(days=7)
+
 
 class Source:
     def __init__(
@@ -132,6 +138,13 @@ class Source:
                 regex=regex,
                 title_template=title_template,
             )
+        elif version == 3:
+            self._ics = ICS_v3(
+                offset=offset,
+                split_at=split_at,
+                regex=regex,
+                title_template=title_template,
+            )
         else:
             self._ics = ICS(
                 offset=offset,
@@ -145,6 +158,9 @@ class Source:
         self._verify_ssl = verify_ssl
         self._headers = HEADERS
         self._headers.update(headers)
+        # validators and converted dates of the last download, per url + params
+        self._url_cache = {}
+        self._session = Session()
 
     def fetch(self):
         if self._url is not None:
@@ -181,27 +197,62 @@ class Source:
             return self.fetch_file(self._file)
 
     def fetch_url(self, url, params=None):
+        cache_key = (url, repr(params))
+        today = datetime.date.today()
+        cached = self._url_cache.get(cache_key)
+        if cached is not None and today - cached["converted"] > CONVERT_MAX_AGE:
+            cached = None
+
+        # send a conditional request if the file has been downloaded before
+        headers = dict(self._headers)
+        if cached is not None:
+            if cached["etag"] is not None:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"] is not None:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
         # get ics file
         if self._method == "GET":
-            r = requests.get(
-                url, params=params, headers=self._headers, verify=self._verify_ssl
+            r = self._session.get(
+                url, params=params, headers=headers, verify=self._verify_ssl
             )
         elif self._method == "POST":
-            r = requests.post(
-                url, data=params, headers=self._headers, verify=self._verify_ssl
+            r = self._session.post(
+                url, data=params, headers=headers, verify=self._verify_ssl
             )
         else:
             raise RuntimeError(
                 "Error: unknown method to fetch URL, use GET or POST; got {self._method}"
             )
+
+        if cached is not None and r.status_code == 304:
+            _LOGGER.debug(f"{url} not modified, reusing parsed entries")
+            return self._to_collections(cached["dates"])
         r.raise_for_status()
 
-        if r.apparent_encoding == "UTF-8-SIG":
-            r.encoding = "UTF-8-SIG"
+        # fall back to a content hash if the server doesn't support validators
+        digest = hashlib.sha256(r.content).hexdigest()
+        if cached is not None and cached["hash"] == digest:
+            _LOGGER.debug(f"{url} unchanged, reusing parsed entries")
+            dates = cached["dates"]
+            converted = cached["converted"]
         else:
-            r.encoding = "utf-8"  # requests doesn't guess the encoding correctly
+            if r.apparent_encoding == "UTF-8-SIG":
+                r.encoding = "UTF-8-SIG"
+            else:
+                r.encoding = "utf-8"  # requests doesn't guess the encoding correctly
+
+            dates = self._ics.convert(r.text)
+            converted = today
 
-        return self._convert(r.text)
+        self._url_cache[cache_key] = {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "hash": digest,
+            "dates": dates,
+            "converted": converted,
+        }
+        return self._to_collections(dates)
 
     def fetch_file(self, file):
         try:
@@ -212,8 +263,9 @@ class Source:
         return self._convert(f.read())
 
     def _convert(self, data):
-        dates = self._ics.convert(data)
+        return self._to_collections(self._ics.convert(data))
 
+    def _to_collections(self, dates):
         entries = []
         for d in dates:
             entries.append(Collection(d[0], d[1]))
@@ -0,0 +1,217 @@
+"""Metadata of all sources, extracted without importing them.
+
+The manifest is built from the syntax tree of the source files, so listing all
+sources doesn't execute them. It is cached in MANIFEST_FILE: a source file is
+only parsed again if its modification time or size changed and its content
+hash differs.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_DIR = Path(__file__).resolve().parent / "source"
+MANIFEST_FILE = Path(__file__).resolve().parent / "source_manifest.json"
+MANIFEST_VERSION = 2
+
+# module attributes which are extracted from a source
+ATTRIBUTE_NAMES = ("TITLE", "DESCRIPTION", "URL", "COUNTRY", "EXTRA_INFO", "TEST_CASES")
+
+
+def read_source(path):
+    """Return manifest entry of one source file.
+
+    The entry contains:
+    attributes -- module attributes with literal values
+    dynamic -- names of module attributes which are not literals, e.g. functions,
+               or which are changed after their assignment
+    args -- arguments of Source.__init__, as name, default (code) and required
+    """
+    path = Path(path)
+    content = path.read_bytes()
+    stat = path.stat()
+    entry = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    entry.update(_parse(ast.parse(content, filename=str(path))))
+    return entry
+
+
+def _parse(tree):
+    attributes = {}
+    dynamic = []
+    args = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            if node.name in ATTRIBUTE_NAMES:
+                dynamic.append(node.name)
+            elif node.name == "Source" and isinstance(node, ast.ClassDef):
+                args = _parse_source_args(node)
+            continue
+        else:
+            continue
+
+        for target in targets:
+            if not isinstance(target, ast.Name) or target.id not in ATTRIBUTE_NAMES:
+                continue
+            try:
+                value = ast.literal_eval(node.value)
+                json.dumps(value)  # e.g. sets can't be stored in the manifest
+                attributes[target.id] = value
+                if target.id in dynamic:
+                    dynamic.remove(target.id)
+            except (ValueError, TypeError):
+                attributes.pop(target.id, None)
+                dynamic.append(target.id)
+
+    # e.g. TEST_CASES.update(...) after TEST_CASES = {...}
+    for name in _mutated_names(tree):
+        if name in attributes:
+            del attributes[name]
+            dynamic.append(name)
+
+    return {"attributes": attributes, "dynamic": dynamic, "args": args}
+
+
+def _mutated_names(tree):
+    """Return names which are changed in place by module level code.
+
+    Covers augmented assignments, assignments to and deletions of items or
+    attributes, and method calls, which may change the object in place.
+    """
+    names = set()
+    for statement in tree.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for node in ast.walk(statement):
+            if isinstance(node, ast.AugAssign):
+                targets = [node.target]
+            elif isinstance(node, (ast.Assign, ast.Delete)):
+                targets = [
+                    t
+                    for t in node.targets
+                    if isinstance(t, (ast.Subscript, ast.Attribute))
+                ]
+            elif isinstance(node, ast.AnnAssign):
+                targets = [node.target] if not isinstance(node.target, ast.Name) else []
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                targets = [node.func.value]
+            else:
+                continue
+            for target in targets:
+                while isinstance(target, (ast.Subscript, ast.Attribute)):
+                    target = target.value
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+    return names
+
+
+def _parse_source_args(node):
+    """Return arguments of Source.__init__, None if not found."""
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+            break
+    else:
+        return None
+
+    a = item.args
+    positional = a.posonlyargs + a.args
+    defaults = [None] * (len(positional) - len(a.defaults)) + a.defaults
+    args = []
+    for arg, default in list(zip(positional, defaults))[1:] + list(
+        zip(a.kwonlyargs, a.kw_defaults)
+    ):
+        args.append(
+            {
+                "name": arg.arg,
+                "annotation": ast.unparse(arg.annotation) if arg.annotation else None,
+                "default": ast.unparse(default) if default is not None else None,
+                "required": default is None,
+            }
+        )
+    for arg, prefix in ((a.vararg, "*"), (a.kwarg, "**")):
+        if arg is not None:
+            args.append(
+                {
+                    "name": prefix + arg.arg,
+                    "annotation": None,
+                    "default": None,
+                    "required": False,
+                }
+            )
+    return args
+
+
+def load_manifest(source_dir=SOURCE_DIR, manifest_file=MANIFEST_FILE):
+    """Return dict of source name -> manifest entry for all sources.
+
+    Only changed source files are parsed, the cache file is updated if
+    necessary. Use manifest_file=None to disable the cache.
+    """
+    cached = {}
+    if manifest_file is not None:
+        try:
+            with open(manifest_file) as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                cached = data["sources"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as exc:
+            _LOGGER.warning(f"ignoring invalid manifest {manifest_file}: {exc}")
+
+    sources = {}
+    changed = False
+    for path in sorted(Path(source_dir).glob("*.py")):
+        name = path.stem
+        if name == "__init__":
+            continue
+        entry = cached.get(name)
+        stat = path.stat()
+        if entry is not None and (
+            entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size
+        ):
+            # modification time also changes on checkout, compare the content
+            content = path.read_bytes()
+            if hashlib.sha256(content).hexdigest() == entry["sha256"]:
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            else:
+                entry = None
+            changed = True
+        if entry is None:
+            try:
+                entry = read_source(path)
+            except SyntaxError as exc:
+                _LOGGER.error(f"failed to parse source {name}: {exc}")
+                continue
+            changed = True
+        sources[name] = entry
+
+    changed = changed or sources.keys() != cached.keys()
+    if manifest_file is not None and changed:
+        try:
+            with open(manifest_file, "w") as f:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "sources": sources},
+                    f,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+        except OSError as exc:
+            _LOGGER.warning(f"failed to store manifest {manifest_file}: {exc}")
+    return sources
+
+
+def get_country(name, entry):
+    """Return country of a source, derived from its name if not specified."""
+    return entry["attributes"].get("COUNTRY", name.split("_")[-1])
@@ -1,13 +1,226 @@
 import datetime
+import hashlib
 import importlib
+import json
 import logging
+import random
+import threading
+import time
 import traceback
+from collections import deque
+from contextlib import nullcontext
+from enum import Enum
 from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
 
 from .collection import Collection
+from .http_client import RequestStats, track_requests
+from .source_manifest import SOURCE_DIR, read_source
 
 _LOGGER = logging.getLogger(__name__)
 
+# module attributes of a source which are needed before it is imported
+SOURCE_INFO_NAMES = ("TITLE", "DESCRIPTION", "URL")
+
+# maximum time in seconds a source may take to return its entries
+DEFAULT_FETCH_TIMEOUT = 120
+
+# number of fetches the average fetch duration is calculated from
+METRICS_ROLLING_FETCHES = 10
+
+# limits of the adaptive refresh interval in days
+DEFAULT_MIN_REFRESH_INTERVAL = 1
+DEFAULT_MAX_REFRESH_INTERVAL = 7
+
+# maximum number of days a collection can be moved by the service provider,
+# a removed and an added date of the same type further apart are reported
+# as separate changes
+MAX_MOVE_DAYS = 14
+
+# retries of a fetch which failed because of a transient error, the delay in
+# seconds is doubled on every retry
+FETCH_RETRIES = 2
+RETRY_DELAY = 5
+
+# failed fetches after which a host is considered to be down
+BREAKER_THRESHOLD = 2
+# seconds until a host which is down is probed again, doubled on every failed
+# probe
+BREAKER_COOLDOWN = 3600
+BREAKER_MAX_COOLDOWN = 6 * 3600
+# seconds to wait for the result of a probe which is in flight
+BREAKER_PROBE_WAIT = DEFAULT_FETCH_TIMEOUT
+
+_breakers_lock = threading.Lock()
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class FetchStatus(Enum):
+    """Outcome of the last fetch of a source."""
+
+    ok = "ok"
+    failed = "failed"
+    timeout = "timeout"
+    host_unavailable = "host_unavailable"
+
+
+def is_transient_error(exc):
+    """Return True if a retry of the failed fetch might succeed."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+def _get_error_host(exc):
+    """Return the host of the request which raised exc, if known."""
+    request = getattr(exc, "request", None)
+    url = getattr(request, "url", None)
+    if url is None and getattr(exc, "response", None) is not None:
+        url = exc.response.url
+    return urlsplit(url).hostname if url else None
+
+
+class CircuitBreaker:
+    """Let fetches fail fast while a host is down.
+
+    The breaker opens after BREAKER_THRESHOLD failed fetches. After the
+    cooldown, a single fetch is let through as probe (half-open). The breaker
+    closes if the probe succeeds, otherwise it opens again with doubled
+    cooldown.
+    """
+
+    def __init__(self, host):
+        self._host = host
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._cooldown = BREAKER_COOLDOWN
+        self._open_until: Optional[float] = None
+        self._probing = False
+
+    @property
+    def host(self):
+        return self._host
+
+    @staticmethod
+    def get(host):
+        """Return the breaker of host, shared by all shells."""
+        with _breakers_lock:
+            breaker = _breakers.get(host)
+            if breaker is None:
+                breaker = _breakers[host] = CircuitBreaker(host)
+            return breaker
+
+    def allow(self):
+        """Return True if a fetch may access the host."""
+        with self._lock:
+            if self._open_until is None:
+                return True
+            if self._probing or time.monotonic() < self._open_until:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._cooldown = BREAKER_COOLDOWN
+            self._open_until = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing:
+                self._probing = False
+                self._cooldown = min(2 * self._cooldown, BREAKER_MAX_COOLDOWN)
+                self._open_until = time.monotonic() + self._cooldown
+            elif self._open_until is None and self._failures >= BREAKER_THRESHOLD:
+                self._open_until = time.monotonic() + self._cooldown
+                _LOGGER.warning(
+                    f"{self._host} seems to be down, next attempt in {self._cooldown} seconds"
+                )
+
+    def retry_delay(self):
+        """Return seconds until the host is probed again, None if closed."""
+        with self._lock:
+            if self._open_until is None:
+                return None
+            if self._probing:
+                # another shell is probing, its result is not known yet
+                return BREAKER_PROBE_WAIT
+            return max(0.0, self._open_until - time.monotonic())
+
+
+class FetchMetrics:
+    """Statistics about the fetches of one source.
+
+    The values of the last fetch are kept if a fetch fails, except for
+    duration, requests, bytes and spans, which also describe failed fetches.
+    spans are the requests of the last fetch, see http_client.RequestStats.
+    """
+
+    def __init__(self):
+        self.fetches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.duration: Optional[float] = None  # seconds
+        self.parse_time: Optional[float] = None  # seconds, without network
+        self.requests: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self.entries: Optional[int] = None
+        self.started: Optional[float] = None  # epoch seconds
+        self.spans: List[dict] = []
+        self._durations: deque = deque(maxlen=METRICS_ROLLING_FETCHES)
+
+    @property
+    def average_duration(self):
+        """Average duration in seconds of the last fetches."""
+        if not self._durations:
+            return None
+        return sum(self._durations) / len(self._durations)
+
+    def record(self, duration, stats, error=None, entries=None, parse_time=None):
+        """Record a completed, failed or timed out fetch."""
+        self.fetches += 1
+        self.duration = duration
+        self._durations.append(duration)
+        self.started = stats.started
+        self.requests = stats.requests
+        self.bytes = stats.bytes
+        self.spans = stats.spans
+        if error is None:
+            self.consecutive_failures = 0
+            self.entries = entries
+            self.parse_time = parse_time
+        else:
+            self.record_failure(error)
+
+    def record_failure(self, error):
+        """Record a failed fetch, also if the source has not been called."""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+
+    def as_dict(self):
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "duration": self.duration,
+            "average_duration": self.average_duration,
+            "parse_time": self.parse_time,
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "entries": self.entries,
+        }
+
 
 class Customize:
     """Customize one waste collection type."""
@@ -82,6 +295,146 @@ def customize_function(entry: Collection, customize: Dict[str, Customize]):
     return entry
 
 
+def diff_entries(old, new, since=None):
+    """Return changes between two lists of entries, per waste type.
+
+    Returns dict of type -> {"added": [date], "removed": [date],
+    "moved": [(old date, new date)]}, containing only types which changed.
+    Entries before since (a date) are ignored, so dates which are dropped
+    after they passed are not reported.
+
+    Both lists are sorted by (type, date) and compared in one merge pass.
+    """
+    first = since.toordinal() if since is not None else None
+
+    def keys(entries):
+        return sorted(
+            {
+                (e.type, e.ordinal)
+                for e in entries
+                if first is None or e.ordinal >= first
+            }
+        )
+
+    old_keys, new_keys = keys(old), keys(new)
+    removed: Dict[str, List[int]] = {}
+    added: Dict[str, List[int]] = {}
+    i = j = 0
+    while i < len(old_keys) or j < len(new_keys):
+        if j == len(new_keys) or (i < len(old_keys) and old_keys[i] < new_keys[j]):
+            removed.setdefault(old_keys[i][0], []).append(old_keys[i][1])
+            i += 1
+        elif i == len(old_keys) or new_keys[j] < old_keys[i]:
+            added.setdefault(new_keys[j][0], []).append(new_keys[j][1])
+            j += 1
+        else:
+            i += 1
+            j += 1
+
+    return {
+        t: _pair_moves(removed.get(t, []), added.get(t, []))
+        for t in sorted(removed.keys() | added.keys())
+    }
+
+
+def _pair_moves(removed, added):
+    """Pair removed and added date ordinals which are close to each other.
+
+    Both lists are sorted, so they are paired in one pass like a merge.
+    """
+    date = datetime.date.fromordinal
+    result: Dict[str, list] = {"added": [], "removed": [], "moved": []}
+    i = j = 0
+    while i < len(removed) and j < len(added):
+        if abs(removed[i] - added[j]) <= MAX_MOVE_DAYS:
+            result["moved"].append((date(removed[i]), date(added[j])))
+            i += 1
+            j += 1
+        elif removed[i] < added[j]:
+            result["removed"].append(date(removed[i]))
+            i += 1
+        else:
+            result["added"].append(date(added[j]))
+            j += 1
+    result["removed"].extend(map(date, removed[i:]))
+    result["added"].extend(map(date, added[j:]))
+    return result
+
+
+def read_source_entry(source_name):
+    """Return manifest entry of a source without importing it.
+
+    Returns None if the source file doesn't exist or can't be parsed.
+    """
+    try:
+        return read_source(SOURCE_DIR / f"{source_name}.py")
+    except (OSError, SyntaxError):
+        return None
+
+
+def check_source_args(args, source_args):
+    """Return error message if source_args don't match Source.__init__.
+
+    args -- arguments of Source.__init__ from the manifest entry
+    Returns None if the arguments match.
+    """
+    names = [arg["name"] for arg in args]
+    if not any(name.startswith("**") for name in names):
+        unknown = sorted(name for name in source_args if name not in names)
+        if unknown:
+            return (
+                f"unknown argument(s) {', '.join(unknown)}, "
+                f"supported arguments are {', '.join(names) or 'none'}"
+            )
+    missing = [
+        arg["name"]
+        for arg in args
+        if arg["required"]
+        and not arg["name"].startswith("*")
+        and arg["name"] not in source_args
+    ]
+    if missing:
+        return f"missing required argument(s) {', '.join(missing)}"
+    return None
+
+
+class LazySource:
+    """Import a source module and create its Source on first fetch.
+
+    Sources import their dependencies (bs4, lxml, icalendar, ...) at module
+    level, so importing all configured sources would delay the startup.
+    """
+
+    def __init__(self, source_name, source_args):
+        self._source_name = source_name
+        self._source_args = source_args
+        self._source = None
+        self._import_time: Optional[float] = None
+
+    @property
+    def import_time(self):
+        """Seconds it took to import the source module, None if not imported."""
+        return self._import_time
+
+    def load(self):
+        """Return the source, import its module if not done yet."""
+        if self._source is None:
+            start = time.perf_counter()
+            module = importlib.import_module(
+                f"waste_collection_schedule.source.{self._source_name}"
+            )
+            if self._import_time is None:
+                self._import_time = time.perf_counter() - start
+                _LOGGER.debug(
+                    f"source {self._source_name} imported in {1000 * self._import_time:.0f} ms"
+                )
+            self._source = module.Source(**self._source_args)  # type: ignore
+        return self._source
+
+    def fetch(self):
+        return self.load().fetch()
+
+
 class SourceShell:
     def __init__(
         self,
@@ -92,6 +445,7 @@ class SourceShell:
         url: Optional[str],
         calendar_title: Optional[str],
         unique_id: str,
+        fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
     ):
         self._source = source
         self._customize = customize
@@ -100,13 +454,69 @@ class SourceShell:
         self._url = url
         self._calendar_title = calendar_title
         self._unique_id = unique_id
+        self._fetch_timeout = fetch_timeout
         self._refreshtime = None
+        self._fetch_status: Optional[FetchStatus] = None
+        self._worker: Optional[threading.Thread] = None
+        self._fetch_lock = threading.Lock()  # held while fetch() is running
+        self._breaker: Optional[CircuitBreaker] = None  # host of last error
+        self._metrics = FetchMetrics()
         self._entries: List[Collection] = []
+        self._cache_entries: List[list] = []
+
+        # change history of the fetched entries, for the refresh interval
+        self._content_hash: Optional[str] = None
+        self._unchanged_fetches = 0
+        self._first_date: Optional[datetime.date] = None
+        self._last_date: Optional[datetime.date] = None
+
+        # changes of the upcoming entries by the last fetch, see diff_entries()
+        self._changes: Dict[str, dict] = {}
+
+        # type -> date of the last archived collection before today
+        self._archived_last: Dict[str, datetime.date] = {}
 
     @property
     def refreshtime(self):
         return self._refreshtime
 
+    @property
+    def fetch_status(self):
+        """Outcome of the last fetch, None if not fetched yet."""
+        return self._fetch_status
+
+    @property
+    def fetch_timeout(self):
+        return self._fetch_timeout
+
+    @property
+    def retry_delay(self):
+        """Seconds until the unavailable host of the source is probed again.
+
+        None if the last fetch didn't fail because its host is down.
+        """
+        if self._breaker is None or self._fetch_status == FetchStatus.ok:
+            return None
+        return self._breaker.retry_delay()
+
+    @property
+    def changes(self):
+        """Changes of the upcoming entries by the last fetch, per waste type.
+
+        Empty if the last fetch didn't change the entries, failed, or was the
+        first fetch. See diff_entries() for the format.
+        """
+        return self._changes
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def import_time(self):
+        """Seconds it took to import the source, None if not imported yet."""
+        return getattr(self._source, "import_time", None)
+
     @property
     def title(self):
         return self._title
@@ -127,29 +537,273 @@ class SourceShell:
     def unique_id(self):
         return self._unique_id
 
-    def fetch(self):
-        """Fetch data from source."""
+    def fetch(self, profile=None):
+        """Fetch data from source.
+
+        The source runs in a worker thread which is abandoned if it doesn't
+        return within fetch_timeout seconds. Transient errors are retried
+        with exponential backoff. The previous entries are kept in case of a
+        timeout or an error.
+
+        profile -- optional profiling.FetchProfile to profile the fetch with
+
+        Returns False if the fetch was skipped because another caller is
+        fetching the source, the results belong to that caller.
+        """
+        # e.g. fetch_data service called during the scheduled fetch
+        if not self._fetch_lock.acquire(blocking=False):
+            _LOGGER.warning(
+                f"fetch skipped for source {self._title}: already being fetched"
+            )
+            return False
         try:
-            # fetch returns a list of Collection's
-            entries = self._source.fetch()
-        except Exception:
+            self._fetch(profile)
+        finally:
+            self._fetch_lock.release()
+        return True
+
+    def _fetch(self, profile):
+        self._changes = {}
+
+        # checked before the breaker, because a probe which is let through by
+        # the breaker must complete with record_success() or record_failure()
+        if self._worker is not None and self._worker.is_alive():
             _LOGGER.error(
-                f"fetch failed for source {self._title}:\n{traceback.format_exc()}"
+                f"fetch skipped for source {self._title}: previous fetch still running"
+            )
+            self._fetch_status = FetchStatus.timeout
+            self._metrics.record_failure("previous fetch still running")
+            return
+
+        if self._breaker is not None and not self._breaker.allow():
+            _LOGGER.warning(
+                f"fetch skipped for source {self._title}: {self._breaker.host} is unavailable"
             )
+            self._fetch_status = FetchStatus.host_unavailable
+            self._metrics.record_failure(f"{self._breaker.host} is unavailable")
             return
-        self._refreshtime = datetime.datetime.now()
+
+        result: dict = {"retry_wait": 0.0}
+        stats = RequestStats()
+        imported = self.import_time is not None
+        start = time.perf_counter()
+        self._worker = threading.Thread(
+            target=self._fetch_source,
+            args=(result, stats, profile),
+            name=f"wcs_source_{self._title}",
+            daemon=True,
+        )
+        self._worker.start()
+        self._worker.join(self._fetch_timeout)
+        duration = time.perf_counter() - start
+
+        if self._worker.is_alive():
+            _LOGGER.error(
+                f"fetch timed out for source {self._title} after {self._fetch_timeout} seconds"
+            )
+            self._fetch_status = FetchStatus.timeout
+            self._metrics.record(duration, stats, error="timeout")
+            if profile is not None:
+                profile.complete = False
+            if self._breaker is not None:
+                self._breaker.record_failure()
+            return
+
+        self._worker = None
+        if "error" in result:
+            _LOGGER.error(f"fetch failed for source {self._title}:\n{result['error']}")
+            self._fetch_status = FetchStatus.failed
+            self._metrics.record(duration, stats, error=repr(result["exception"]))
+            self._update_breaker(result["exception"])
+            return
+
+        # time spent in the source itself, e.g. to parse the responses
+        parse_time = duration - stats.time - stats.wait - result["retry_wait"]
+        if not imported and self.import_time is not None:
+            parse_time -= self.import_time
+        self._metrics.record(
+            duration,
+            stats,
+            entries=len(result["entries"]),
+            parse_time=max(0.0, parse_time),
+        )
+
+        self._fetch_status = FetchStatus.ok
+        self._update_breaker(None)
+        previous = self._entries if self._refreshtime is not None else None
+        with profile.customize() if profile is not None else nullcontext():
+            self._set_entries(result["entries"], datetime.datetime.now())
+        if previous is not None:
+            self._changes = diff_entries(
+                previous, self._entries, since=datetime.date.today()
+            )
+
+        content_hash = self._calc_content_hash()
+        if content_hash == self._content_hash:
+            self._unchanged_fetches += 1
+        else:
+            self._unchanged_fetches = 0
+        self._content_hash = content_hash
+
+    def refresh_interval(
+        self,
+        min_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+    ):
+        """Return number of days between two fetches of this source.
+
+        The interval doubles with every fetch which returned the same entries
+        as the fetch before. It is limited to half of the days which are
+        covered by the fetched entries, so a source is fetched again well
+        before it runs out of dates.
+        """
+        interval = 2 ** min(self._unchanged_fetches, 16)
+        if self._last_date is None:
+            interval = min_interval
+        else:
+            horizon = (self._last_date - datetime.date.today()).days
+            interval = min(interval, horizon // 2)
+        return max(min_interval, min(max_interval, interval))
+
+    def fetch_due(
+        self,
+        min_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+    ):
+        """Return True if the refresh interval of this source has elapsed.
+
+        Sources which have never been fetched or whose last fetch failed are
+        always due.
+        """
+        if self._refreshtime is None or self._fetch_status not in (
+            None,
+            FetchStatus.ok,
+        ):
+            return True
+        interval = self.refresh_interval(min_interval, max_interval)
+        next_fetch = self._refreshtime.date() + datetime.timedelta(days=interval)
+        return datetime.date.today() >= next_fetch
+
+    def _set_entries(self, entries, refreshtime):
+        """Apply customization to fetched entries and make them current."""
+        self._refreshtime = refreshtime
 
         # strip whitespaces
         for e in entries:
             e.set_type(e.type.strip())
 
+        # remember the entries as fetched, before customize is applied
+        self._cache_entries = [
+            [e.date.isoformat(), e.type, e.icon, e.picture] for e in entries
+        ]
+        self._first_date = min((e.date for e in entries), default=None)
+        self._last_date = max((e.date for e in entries), default=None)
+
+        self._entries = self.customize_entries(entries)
+
+    def customize_entries(self, entries):
+        """Return list of entries with hidden types removed and customize applied."""
         # filter hidden entries
         entries = filter(lambda x: filter_function(x, self._customize), entries)
 
         # customize fetched entries
         entries = map(lambda x: customize_function(x, self._customize), entries)
 
-        self._entries = list(entries)
+        return list(entries)
+
+    @property
+    def fetched_entries(self):
+        """Return list of (date, type) of the last fetch, before customize."""
+        return [(datetime.date.fromisoformat(e[0]), e[1]) for e in self._cache_entries]
+
+    def archive_cutoff(self):
+        """Return the first date for which the fetched entries are complete.
+
+        The archive must only be used for dates before the cutoff: later
+        collections which have been moved or cancelled are still archived,
+        but the fetched entries reflect the current schedule.
+        """
+        today = datetime.date.today()
+        if self._first_date is None:
+            return today
+        return min(today, self._first_date)
+
+    def set_archived_last(self, last):
+        """Set dict of type -> date of the last archived collection."""
+        self._archived_last = last
+
+    def get_archived_last(self):
+        """Return the last archived collection of every type, customized."""
+        return self.customize_entries(
+            Collection(date=date, t=t) for t, date in self._archived_last.items()
+        )
+
+    def to_cache(self):
+        """Return last successful fetch result in a JSON serializable form.
+
+        The entries are stored before customize is applied, so a changed
+        customize configuration also applies to cached entries.
+        """
+        if self._refreshtime is None:
+            return None
+        return {
+            "refreshtime": self._refreshtime.isoformat(),
+            "entries": self._cache_entries,
+            "unchanged_fetches": self._unchanged_fetches,
+        }
+
+    def restore_cache(self, data):
+        """Restore entries from the result of to_cache()."""
+        entries = [
+            Collection(
+                date=datetime.date.fromisoformat(e[0]), t=e[1], icon=e[2], picture=e[3]
+            )
+            for e in data["entries"]
+        ]
+        self._set_entries(entries, datetime.datetime.fromisoformat(data["refreshtime"]))
+        self._content_hash = self._calc_content_hash()
+        self._unchanged_fetches = data.get("unchanged_fetches", 0)
+
+    def _calc_content_hash(self):
+        return hashlib.sha256(json.dumps(self._cache_entries).encode()).hexdigest()
+
+    def _update_breaker(self, exc):
+        """Track availability of the host of the last error."""
+        host = _get_error_host(exc) if is_transient_error(exc) else None
+        if host is not None:
+            if self._breaker is not None and self._breaker.host != host:
+                self._breaker.record_success()
+            self._breaker = CircuitBreaker.get(host)
+            self._breaker.record_failure()
+        elif self._breaker is not None:
+            # the host responded, even if the source failed afterwards
+            self._breaker.record_success()
+            self._breaker = None
+
+    def _fetch_source(self, result, stats, profile=None):
+        """Run source.fetch() and store its outcome in result."""
+        with track_requests(stats):
+            with profile.fetch() if profile is not None else nullcontext():
+                self._fetch_source_with_retries(result)
+
+    def _fetch_source_with_retries(self, result):
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                # fetch returns a list of Collection's
+                result["entries"] = self._source.fetch()
+                return
+            except Exception as exc:
+                if attempt == FETCH_RETRIES or not is_transient_error(exc):
+                    result["error"] = traceback.format_exc()
+                    result["exception"] = exc
+                    return
+                # full jitter to spread retries of sources of the same host
+                delay = random.uniform(0, RETRY_DELAY * 2**attempt)
+                _LOGGER.warning(
+                    f"fetch failed for source {self._title}: {exc!r}, retry in {delay:.1f} seconds"
+                )
+                time.sleep(delay)
+                result["retry_wait"] += delay
 
     def get_dedicated_calendar_types(self):
         """Return set of waste types with a dedicated calendar."""
@@ -182,28 +836,40 @@ class SourceShell:
         customize: Dict[str, Customize],
         source_args,
         calendar_title: Optional[str] = None,
+        fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
     ):
-        # load source module
-        try:
-            source_module = importlib.import_module(
-                f"waste_collection_schedule.source.{source_name}"
-            )
-        except ImportError:
-            _LOGGER.error(f"source not found: {source_name}")
-            return
-
-        # create source
-        source = source_module.Source(**source_args)  # type: ignore
+        # the source module is imported on first fetch
+        entry = read_source_entry(source_name)
+        if entry is not None and entry["args"] is not None:
+            error = check_source_args(entry["args"], source_args)
+            if error is not None:
+                _LOGGER.error(f"invalid configuration of source {source_name}: {error}")
+                return
+
+        info = entry["attributes"] if entry is not None else {}
+        if all(name in info for name in SOURCE_INFO_NAMES):
+            info = {name: info[name] for name in SOURCE_INFO_NAMES}
+        else:
+            # attributes are not literals, import the module to get them
+            try:
+                source_module = importlib.import_module(
+                    f"waste_collection_schedule.source.{source_name}"
+                )
+            except ImportError:
+                _LOGGER.error(f"source not found: {source_name}")
+                return
+            info = {name: getattr(source_module, name) for name in SOURCE_INFO_NAMES}
 
         # create source shell
         g = SourceShell(
-            source=source,
+            source=LazySource(source_name, source_args),
             customize=customize,
-            title=source_module.TITLE,  # type: ignore[attr-defined]
-            description=source_module.DESCRIPTION,  # type: ignore[attr-defined]
-            url=source_module.URL,  # type: ignore[attr-defined]
+            title=info["TITLE"],
+            description=info["DESCRIPTION"],
+            url=info["URL"],
             calendar_title=calendar_title,
             unique_id=calc_unique_source_id(source_name, source_args),
+            fetch_timeout=fetch_timeout,
         )
 
         return g
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Measure the parsing cost of sources without network access.
+
+Every benchmark case replays the HTTP responses recorded in a cassette, so the
+measured time is spent in the source and the services it uses. Each case runs
+in a fresh process to get a meaningful peak RSS, with today fixed to
+BENCHMARK_TODAY so the results don't change from day to day.
+
+The cassettes of abfallnavi_de and durham_gov_uk are synthetic: they were
+written by hand in the response format the sources expect, because the
+websites couldn't be recorded. Their numbers show the cost of the parsers on
+that data, not the timings of the real providers. These cases are marked as
+synthetic in the output and in the baseline.
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import multiprocessing
+import resource
+import site
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from http_cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteMissError,
+    cassette_path,
+)
+
+TEST_DIR = Path(__file__).resolve().parent
+BASELINE_FILENAME = TEST_DIR / "benchmark_baseline.json"
+
+# (source, name of test case in TEST_CASES, additional source arguments)
+BENCHMARK_CASES = [
+    ("ics", "Test File", {}),
+    ("ics", "Test File", {"version": 1}),
+    ("ics", "Test File", {"version": 3}),
+    ("ics", "Test File (recurring)", {}),
+    ("ics", "Test File (recurring)", {"version": 1}),
+    ("ics", "Test File (recurring)", {"version": 3}),
+    ("abfallnavi_de", "Aachen, Abteiplatz 7", {}),
+    ("durham_gov_uk", "Test_001", {}),
+]
+
+# the ICS sources only return collections within a year from today, the test
+# files contain collections of 2020
+BENCHMARK_TODAY = datetime.date(2020, 1, 1)
+
+# metrics which are compared against the baseline
+METRICS = ("time_ms", "peak_alloc_kb", "peak_rss_kb")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark source parsers.")
+    parser.add_argument(
+        "-s", "--source", action="append", help="Benchmark given source only"
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs per case (default: 5)",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Record the cassettes of the benchmark cases from the live websites",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"Store results as new baseline in {BASELINE_FILENAME.name}",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative increase reported as regression (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    cases = [c for c in BENCHMARK_CASES if args.source is None or c[0] in args.source]
+
+    if args.record:
+        for source, name, extra_args in cases:
+            record_case(source, name, extra_args)
+
+    baseline = {}
+    if BASELINE_FILENAME.exists():
+        with open(BASELINE_FILENAME) as f:
+            baseline = json.load(f)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    regressions = []
+    print(f"{'case':<50} {'entries':>7} {'time ms':>9} {'alloc kB':>9} {'rss kB':>9}")
+    for source, name, extra_args in cases:
+        case_id = get_case_id(source, name, extra_args)
+        with ctx.Pool(1) as pool:
+            result = pool.apply(run_case, (source, name, extra_args, args.repeat))
+        if "error" in result:
+            print(
+                f"{case_id:<50} {bcolors.FAIL}failed{bcolors.ENDC}: {result['error']}"
+            )
+            continue
+
+        results[case_id] = result
+        marks = []
+        for metric in METRICS:
+            old = baseline.get(case_id, {}).get(metric)
+            if old and result[metric] > old * (1 + args.threshold):
+                marks.append(f"{metric} {old} -> {result[metric]}")
+        line = (
+            f"{case_id:<50} {result['entries']:>7} {result['time_ms']:>9}"
+            f" {result['peak_alloc_kb']:>9} {result['peak_rss_kb']:>9}"
+        )
+        if result["synthetic"]:
+            line += " (synthetic cassette)"
+        if marks:
+            regressions.append(case_id)
+            line += f" {bcolors.FAIL}regression: {', '.join(marks)}{bcolors.ENDC}"
+        print(line)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(BASELINE_FILENAME, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {BASELINE_FILENAME}")
+
+    if regressions:
+        print(f"{bcolors.FAIL}{len(regressions)} regression(s){bcolors.ENDC}")
+        sys.exit(1)
+
+
+def record_case(source, name, extra_args):
+    site.addsitedir(str(TEST_DIR.parents[1]))
+    module = importlib.import_module(f"waste_collection_schedule.source.{source}")
+    tc = dict(module.TEST_CASES[name], **extra_args)
+    cassette = Cassette(cassette_path(source, name), RECORD)
+    with cassette:
+        module.Source(**tc).fetch()
+    print(f"recorded {get_case_id(source, name, extra_args)}")
+
+
+def run_case(source, name, extra_args, repeat):
+    """Run one benchmark case, executed in a separate process."""
+    freeze_today(BENCHMARK_TODAY)
+    site.addsitedir(str(TEST_DIR.parents[1]))
+    module = importlib.import_module(f"waste_collection_schedule.source.{source}")
+    tc = dict(module.TEST_CASES[name], **extra_args)
+    path = get_benchmark_cassette(source, name)
+
+    def fetch():
+        source = module.Source(**tc)
+        with Cassette(path, REPLAY):
+            return source.fetch()
+
+    try:
+        # first run warms up caches, e.g. imports done by the source
+        entries = fetch()
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fetch()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        fetch()
+        _, peak_alloc = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    except CassetteMissError as exc:
+        return {"error": f"{exc}, record it with --record"}
+    except Exception as exc:
+        return {"error": repr(exc)}
+
+    return {
+        "synthetic": path.stem.endswith("_synthetic"),
+        "entries": len(entries),
+        "time_ms": round(statistics.median(times) * 1000, 2),
+        "peak_alloc_kb": round(peak_alloc / 1024),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def get_benchmark_cassette(source, name):
+    """Return path of the cassette which is replayed for a case.
+
+    Cassettes which couldn't be recorded from the live website are built from
+    the response format the source expects and are named "<name> synthetic".
+    They are only used as long as no real recording exists.
+    """
+    path = cassette_path(source, name)
+    if not path.exists():
+        synthetic = cassette_path(source, f"{name} synthetic")
+        if synthetic.exists():
+            return synthetic
+    return path
+
+
+def freeze_today(today):
+    """Let date.today() and datetime.now() return the given day.
+
+    Replaces the classes in the datetime module, so it must be called before
+    the sources and the libraries they use are imported.
+    """
+
+    class FrozenMeta(type):
+        # objects created before, e.g. by C code, are still instances
+        def __instancecheck__(cls, obj):
+            return isinstance(obj, cls.__mro__[1])
+
+    class FrozenDate(datetime.date, metaclass=FrozenMeta):
+        @classmethod
+        def today(cls):
+            return cls(today.year, today.month, today.day)
+
+    class FrozenDateTime(datetime.datetime, metaclass=FrozenMeta):
+        @classmethod
+        def now(cls, tz=None):
+            now = cls(today.year, today.month, today.day)
+            return now if tz is None else now.replace(tzinfo=tz)
+
+        @classmethod
+        def today(cls):
+            return cls.now()
+
+    datetime.date = FrozenDate
+    datetime.datetime = FrozenDateTime
+
+
+def get_case_id(source, name, extra_args):
+    case_id = f"{source}: {name}"
+    if extra_args:
+        case_id += " " + ",".join(f"{k}={v}" for k, v in sorted(extra_args.items()))
+    return case_id
+
+
+class bcolors:
+    FAIL = "\033[91m"
+    ENDC = "\033[0m"
+
+
+if __name__ == "__main__":
+    main()
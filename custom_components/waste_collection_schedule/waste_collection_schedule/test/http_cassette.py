@@ -0,0 +1,209 @@
+"""Record and replay the HTTP traffic of sources.
+
+A cassette is a JSON file with all requests a source made and the responses it
+got. In replay mode the responses are served from the cassette and no request
+leaves the machine. Cassettes are activated per thread, so several sources can
+be recorded or replayed in parallel.
+"""
+
+import base64
+import io
+import json
+import re
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_VERSION = 1
+CASSETTE_DIR = Path(__file__).resolve().parent / "cassettes"
+
+RECORD = "record"
+REPLAY = "replay"
+
+_local = threading.local()
+_original_send = HTTPAdapter.send
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """Request not found in cassette while replaying."""
+
+
+class Cassette:
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"invalid cassette mode: {mode}")
+        self._path = Path(path)
+        self._mode = mode
+        self._interactions = []
+        self._used = set()
+        self._missing = False
+        if mode == REPLAY:
+            self._load()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def __enter__(self):
+        _install()
+        self._previous = getattr(_local, "cassette", None)
+        _local.cassette = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.cassette = self._previous
+        if self._mode == RECORD and exc_type is None and self._interactions:
+            self.save()
+
+    def save(self):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, "w") as f:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": self._interactions},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+
+    def _load(self):
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            # not an error as long as the source doesn't send any request
+            self._missing = True
+            return
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version: {self._path}")
+        self._interactions = data["interactions"]
+
+    def send(self, adapter, request, **kwargs):
+        if self._mode == RECORD:
+            response = _original_send(adapter, request, **kwargs)
+            self._interactions.append(
+                {
+                    "request": _encode_request(request),
+                    "response": _encode_response(response),
+                }
+            )
+            return response
+
+        if self._missing:
+            raise CassetteMissError(
+                f"cassette not found: {self._path}", request=request
+            )
+        index = self._find(request)
+        if index is None:
+            raise CassetteMissError(
+                f"{request.method} {request.url} not found in {self._path}",
+                request=request,
+            )
+        self._used.add(index)
+        return _decode_response(self._interactions[index]["response"], request)
+
+    def _find(self, request):
+        """Return index of the best matching interaction.
+
+        Prefer unused interactions with the same body, so repeated requests are
+        answered in the recorded order.
+        """
+        wanted = _encode_request(request)
+        candidates = [
+            i
+            for i, it in enumerate(self._interactions)
+            if it["request"]["method"] == wanted["method"]
+            and it["request"]["url"] == wanted["url"]
+        ]
+        for same_body in (True, False):
+            for i in candidates:
+                if i in self._used:
+                    continue
+                if not same_body or self._interactions[i]["request"]["body"] == (
+                    wanted["body"]
+                ):
+                    return i
+        return candidates[-1] if candidates else None
+
+
+def cassette_path(group, name):
+    """Return path of the cassette for a test case.
+
+    group is the source name, or ics/<yaml file> for ICS yaml test cases.
+    """
+    return CASSETTE_DIR / group / (re.sub(r"\W+", "_", name).strip("_") + ".json")
+
+
+def active_cassette():
+    """Return the cassette active in the current thread."""
+    return getattr(_local, "cassette", None)
+
+
+def _install():
+    if HTTPAdapter.send is not _send:
+        HTTPAdapter.send = _send  # type: ignore[method-assign]
+
+
+def _send(self, request, **kwargs):
+    cassette = active_cassette()
+    if cassette is None:
+        return _original_send(self, request, **kwargs)
+    return cassette.send(self, request, **kwargs)
+
+
+def _encode_body(body):
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return "base64:" + base64.b64encode(body).decode("ascii")
+
+
+def _decode_body(body):
+    if body.startswith("base64:"):
+        return base64.b64decode(body[len("base64:") :])
+    return body.encode("utf-8")
+
+
+def _encode_request(request):
+    body = request.body
+    if body is not None and not isinstance(body, (str, bytes)):
+        body = None  # streamed uploads are not compared
+    return {"method": request.method, "url": request.url, "body": _encode_body(body)}
+
+
+def _encode_response(response):
+    return {
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": {
+            k: v
+            for k, v in response.headers.items()
+            if k.lower() not in ("content-encoding", "transfer-encoding")
+        },
+        "body": _encode_body(response.content) or "",
+    }
+
+
+def _decode_response(data, request):
+    response = requests.Response()
+    response.status_code = data["status"]
+    response.reason = data["reason"]
+    response.headers = CaseInsensitiveDict(data["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response._content = _decode_body(data["body"])
+    response._content_consumed = True
+    response.raw = io.BytesIO(response._content)
+    return response
@@ -2,13 +2,17 @@
 
 import argparse
 import datetime
+import functools
 import importlib
 import re
 import site
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import yaml
+from http_cassette import RECORD, REPLAY, Cassette, cassette_path
 
 SECRET_FILENAME = Path(__file__).resolve().parent / "secrets.yaml"
 SECRET_REGEX = re.compile(r"!secret\s(\w+)")
@@ -39,6 +43,28 @@ def main():
     parser.add_argument(
         "-y", "--yaml", action="append", help="Test given .yaml file for ICS source"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of sources which are tested in parallel",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        action="store_const",
+        const=RECORD,
+        dest="cassette_mode",
+        help="Record HTTP traffic of every test case into test/cassettes",
+    )
+    cassette_group.add_argument(
+        "--replay",
+        action="store_const",
+        const=REPLAY,
+        dest="cassette_mode",
+        help="Replay recorded HTTP traffic instead of accessing the websites",
+    )
     args = parser.parse_args()
 
     # read secrets.yaml
@@ -54,10 +80,13 @@ def main():
         pass
 
     package_dir = Path(__file__).resolve().parents[2]
-    source_dir = package_dir / "waste_collection_schedule" / "source"
 
     # add module directory to path
     site.addsitedir(str(package_dir))
+    from waste_collection_schedule.source_manifest import load_manifest
+
+    # metadata of all sources, without importing them
+    manifest = load_manifest()
 
     # find all source files for testing
     if args.source is not None:
@@ -65,35 +94,11 @@ def main():
         source_files = args.source
     elif not args.ics and args.yaml is None:
         # no ICS yaml files given --> test all source files
-        source_files = filter(
-            lambda x: x != "__init__",
-            map(lambda x: x.stem, source_dir.glob("*.py")),
-        )
+        source_files = manifest.keys()
     else:
         # ICS yaml file(s) given
         source_files = []
 
-    for f in sorted(source_files):
-        # iterate through all *.py files in waste_collection_schedule/source
-        print(f"Testing source {f} ...")
-        module = importlib.import_module(f"waste_collection_schedule.source.{f}")
-
-        # get all names within module
-        names = set(dir(module))
-
-        # test if all mandatory names exist
-        assert "TITLE" in names
-        assert "DESCRIPTION" in names
-        assert "URL" in names
-        assert "TEST_CASES" in names
-
-        # run through all test-cases
-        for name, tc in module.TEST_CASES.items():
-            # replace secrets in arguments
-            replace_secret(secrets, tc)
-
-            test_fetch(module, name, tc, args)
-
     # find all ICS yaml files for testing
     ics_yaml_dir = Path(__file__).resolve().parents[4] / "doc" / "ics" / "yaml"
     if args.ics:
@@ -109,48 +114,147 @@ def main():
         # source files given --> don't test ICS yaml files
         yaml_files = []
 
-    # run through all .yaml files for ICS source
+    tests = [
+        functools.partial(test_source, f, manifest.get(f), secrets, args)
+        for f in sorted(source_files)
+    ]
+    tests += [functools.partial(test_yaml, f, args) for f in sorted(yaml_files)]
+
+    # run tests in parallel, but print the output of every source in one block
+    results = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        for result in executor.map(lambda test: test(), tests):
+            print("\n".join(result.output))
+            results.append(result)
+
+    if len(results) > 1:
+        print_summary(results)
+
+
+class TestResult:
+    def __init__(self, title):
+        self.title = title
+        self.output = []
+        self.passed = 0
+        self.failed = 0
+        self.duration = 0.0
+        self.import_duration = 0.0
+
+
+def test_source(f, entry, secrets, args):
+    """Run all test cases of a source in waste_collection_schedule/source."""
+    result = TestResult(f"source {f}")
+    result.output.append(f"Testing source {f} ...")
+    if entry is None:
+        result.output.append(f"  {bcolors.FAIL}source not found{bcolors.ENDC}")
+        result.failed += 1
+        return result
+
+    # test if all mandatory names exist
+    names = set(entry["attributes"]) | set(entry["dynamic"])
+    assert "TITLE" in names
+    assert "DESCRIPTION" in names
+    assert "URL" in names
+    assert "TEST_CASES" in names
+
+    start = time.perf_counter()
+    module = importlib.import_module(f"waste_collection_schedule.source.{f}")
+    result.import_duration = time.perf_counter() - start
+
+    # run through all test-cases
+    for name, tc in module.TEST_CASES.items():
+        # replace secrets in arguments
+        replace_secret(secrets, tc)
+
+        test_fetch(module, name, tc, args, cassette_path(f, name), result)
+
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def test_yaml(f, args):
+    """Run all test cases of a .yaml file for ICS source."""
+    result = TestResult(f"ICS {f.stem}")
+    result.output.append(f"Testing ICS {f.stem}")
+    start = time.perf_counter()
     module = importlib.import_module("waste_collection_schedule.source.ics")
-    for f in sorted(yaml_files):
-        print(f"Testing ICS {f.stem}")
-        with open(f) as stream:
-            # read yaml file
-            data = yaml.safe_load(stream)
+    result.import_duration = time.perf_counter() - start
+    with open(f) as stream:
+        # read yaml file
+        data = yaml.safe_load(stream)
 
-            # run through all test-cases
-            for name, tc in data["test_cases"].items():
-                test_fetch(module, name, tc, args)
+        # run through all test-cases
+        for name, tc in data["test_cases"].items():
+            test_fetch(
+                module, name, tc, args, cassette_path(f"ics/{f.stem}", name), result
+            )
 
+    result.duration = time.perf_counter() - start
+    return result
 
-def test_fetch(module, name, tc, args):
+
+def test_fetch(module, name, tc, args, cassette_file, result):
+    out = result.output
     # create source
     try:
         source = module.Source(**tc)
-        result = source.fetch()
-        count = len(result)
+        if args.cassette_mode is None:
+            entries = source.fetch()
+        else:
+            with Cassette(cassette_file, args.cassette_mode):
+                entries = source.fetch()
+        count = len(entries)
         if count > 0:
-            print(f"  found {bcolors.OKGREEN}{count}{bcolors.ENDC} entries for {name}")
+            out.append(
+                f"  found {bcolors.OKGREEN}{count}{bcolors.ENDC} entries for {name}"
+            )
         else:
-            print(f"  found {bcolors.WARNING}0{bcolors.ENDC} entries for {name}")
+            out.append(f"  found {bcolors.WARNING}0{bcolors.ENDC} entries for {name}")
 
         # test if source is returning the correct date format
-        if len(list(filter(lambda x: type(x.date) is not datetime.date, result))) > 0:
-            print(
+        if len(list(filter(lambda x: type(x.date) is not datetime.date, entries))) > 0:
+            out.append(
                 f"{bcolors.FAIL}  ERROR: source returns invalid date format (datetime.datetime instead of datetime.date?){bcolors.ENDC}"
             )
 
         if args.list:
-            result = sorted(result, key=lambda x: x.date) if args.sorted else result
-            for x in result:
+            entries = sorted(entries, key=lambda x: x.date) if args.sorted else entries
+            for x in entries:
                 icon_str = f" [{x.icon}]" if args.icon else ""
                 weekday_str = x.date.strftime("%a ") if args.weekday else ""
-                print(f"    {x.date.isoformat()} {weekday_str}: {x.type}{icon_str}")
+                out.append(
+                    f"    {x.date.isoformat()} {weekday_str}: {x.type}{icon_str}"
+                )
+        result.passed += 1
     except KeyboardInterrupt:
         exit()
     except Exception as exc:
-        print(f"  {name} {bcolors.FAIL}failed{bcolors.ENDC}: {exc}")
+        out.append(f"  {name} {bcolors.FAIL}failed{bcolors.ENDC}: {exc}")
         if args.traceback:
-            print(indent(traceback.format_exc(), 4))
+            out.append(indent(traceback.format_exc(), 4))
+        result.failed += 1
+
+
+def print_summary(results):
+    """Print wall time and result of every source, slowest first.
+
+    The import time includes the dependencies of a source which have not been
+    imported by a source tested before.
+    """
+    print()
+    print(f"{'source':<50} {'time s':>8} {'import ms':>10} {'passed':>7} {'failed':>7}")
+    for r in sorted(results, key=lambda r: r.duration, reverse=True):
+        failed = f"{r.failed:>7}"
+        if r.failed > 0:
+            failed = f"{bcolors.FAIL}{failed}{bcolors.ENDC}"
+        print(
+            f"{r.title:<50} {r.duration:>8.2f} {1000 * r.import_duration:>10.0f}"
+            f" {r.passed:>7} {failed}"
+        )
+    print(
+        f"{len(results)} sources, {sum(r.passed for r in results)} test cases passed,"
+        f" {sum(r.failed for r in results)} failed"
+    )
 
 
 def replace_secret(secrets, d):
@@ -0,0 +1,12 @@
+"""Make the waste_collection_schedule package importable for the tests."""
+
+import site
+from pathlib import Path
+
+site.addsitedir(
+    str(
+        Path(__file__).resolve().parents[1]
+        / "custom_components"
+        / "waste_collection_schedule"
+    )
+)
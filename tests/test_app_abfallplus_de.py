@@ -0,0 +1,83 @@
+"""Tests of the client cache of AppAbfallplusDe."""
+
+from datetime import date
+
+import pytest
+import requests
+from waste_collection_schedule.id_cache import configure_id_cache, get_id_cache
+from waste_collection_schedule.service.AppAbfallplusDe import AppAbfallplusDe
+
+APP_ID = "de.k4systems.abfallappwug"
+COLLECTIONS = [{"category": "Restmüll", "date": date(2024, 1, 5)}]
+
+
+def make_response(status=200, text=""):
+    r = requests.Response()
+    r.status_code = status
+    r._content = text.encode()
+    r.url = "https://app.abfallplus.de/struktur.xml.zip"
+    return r
+
+
+@pytest.fixture
+def app(monkeypatch):
+    configure_id_cache()
+    app = AppAbfallplusDe(APP_ID, strasse="Hauptstraße", kommune="Weißenburg")
+    get_id_cache().set(
+        "app_abfallplus_de",
+        app._cache_key,
+        {"client": "stale-client", "needs_subtitle": []},
+    )
+
+    app.assistant_runs = 0
+
+    def run_assistant():
+        app.assistant_runs += 1
+        app._client = "new-client"
+        return COLLECTIONS
+
+    monkeypatch.setattr(app, "_run_assistant", run_assistant)
+    yield app
+    configure_id_cache()
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        make_response(text=""),
+        make_response(text="<plist><dict><key>foo</key></dict></plist>"),
+        make_response(status=404),
+    ],
+    ids=["empty", "invalid", "client error"],
+)
+def test_stale_client_runs_assistant(app, monkeypatch, response):
+    monkeypatch.setattr(app, "_request", lambda *args, **kwargs: response)
+
+    assert app.generate_calendar() == COLLECTIONS
+    assert app.assistant_runs == 1
+    cached = get_id_cache().get("app_abfallplus_de", app._cache_key)
+    assert cached["client"] == "new-client"
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ConnectionError(),
+        requests.exceptions.Timeout(),
+        requests.exceptions.HTTPError(response=make_response(status=503)),
+    ],
+    ids=["connection", "timeout", "server error"],
+)
+def test_transient_error_keeps_client(app, monkeypatch, error):
+    def request(*args, **kwargs):
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response
+        raise error
+
+    monkeypatch.setattr(app, "_request", request)
+
+    with pytest.raises(type(error)):
+        app.generate_calendar()
+    assert app.assistant_runs == 0
+    cached = get_id_cache().get("app_abfallplus_de", app._cache_key)
+    assert cached["client"] == "stale-client"
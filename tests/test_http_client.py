@@ -0,0 +1,126 @@
+"""Tests of the shared HTTP client."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from waste_collection_schedule import http_client
+from waste_collection_schedule.http_client import (
+    RequestStats,
+    Session,
+    refresh_cycle,
+    track_requests,
+)
+from waste_collection_schedule.source_shell import SourceShell
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits.append(("GET", self.path, None))
+        self._reply(b"ok")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.hits.append(("POST", self.path, body))
+        self._reply(f"token-{len(self.server.hits)}".encode())
+
+    def _reply(self, body):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.hits = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", server.hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_hook_only_active_while_tracking(server):
+    url, _ = server
+    original = HTTPAdapter.send
+
+    stats = RequestStats()
+    with track_requests(stats):
+        assert HTTPAdapter.send is not original
+        requests.get(f"{url}/plain/1")  # doesn't use Session
+        http_client.Session().get(f"{url}/shared/2")
+    assert HTTPAdapter.send is original
+
+    assert stats.requests == 2
+    assert [s["path"] for s in stats.spans] == ["/plain/{id}", "/shared/{id}"]
+
+
+def test_request_hook_stays_while_other_thread_tracks(server):
+    url, _ = server
+    original = HTTPAdapter.send
+    entered = threading.Event()
+    leave = threading.Event()
+
+    def other():
+        with track_requests(RequestStats()):
+            entered.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    entered.wait(5)
+    stats = RequestStats()
+    with track_requests(stats):
+        pass
+    assert HTTPAdapter.send is not original
+    requests.get(f"{url}/untracked")  # no stats in this thread
+    leave.set()
+    thread.join()
+    assert HTTPAdapter.send is original
+    assert stats.requests == 0
+
+
+class TokenSource:
+    """Source which gets a form token first, like abfall_io."""
+
+    def __init__(self, url):
+        self._url = url
+        self._session = Session()
+        self.token = None
+
+    def fetch(self):
+        r = self._session.post(self._url, params={"key": "abc", "waction": "init"})
+        self.token = r.text
+        self._session.get(self._url, params={"key": "abc"})
+        return []
+
+
+def make_shell(source, unique_id):
+    return SourceShell(
+        source=source,
+        customize={},
+        title="Token",
+        description="",
+        url=None,
+        calendar_title=None,
+        unique_id=unique_id,
+    )
+
+
+def test_post_is_not_shared_within_refresh_cycle(server):
+    url, hits = server
+    sources = [TokenSource(f"{url}/init"), TokenSource(f"{url}/init")]
+
+    with refresh_cycle():
+        for i, source in enumerate(sources):
+            assert make_shell(source, f"token{i}").fetch()
+
+    assert sources[0].token != sources[1].token
+    assert [method for method, _, _ in hits] == ["POST", "GET", "POST"]
@@ -79,28 +79,28 @@ def browse_sources():
         / "custom_components"
         / "waste_collection_schedule"
     )
-    source_dir = package_dir / "waste_collection_schedule" / "source"
 
     # add module directory to path
     site.addsitedir(str(package_dir))
-
-    files = filter(
-        lambda x: x != "__init__",
-        map(lambda x: x.stem, source_dir.glob("*.py")),
+    from waste_collection_schedule.source_manifest import (
+        get_country,
+        load_manifest,
     )
 
     modules = {}
     sources = []
 
-    # retrieve all data from sources
-    for f in files:
-        # iterate through all *.py files in waste_collection_schedule/source
-        module = importlib.import_module(f"waste_collection_schedule.source.{f}")
-        modules[f] = module
-
-        title = module.TITLE
-        url = module.URL
-        country = getattr(module, "COUNTRY", f.split("_")[-1])
+    # retrieve all data from sources, without importing them if possible
+    for f, entry in load_manifest().items():
+        attributes = entry["attributes"]
+        if "TITLE" in entry["dynamic"] or "URL" in entry["dynamic"]:
+            module = import_source(modules, f)
+            title = module.TITLE
+            url = module.URL
+        else:
+            title = attributes.get("TITLE")
+            url = attributes.get("URL")
+        country = get_country(f, entry)
 
         filename = f"/doc/source/{f}.md"
         if title is not None:
@@ -108,7 +108,11 @@ def browse_sources():
                 SourceInfo(filename=filename, title=title, url=url, country=country)
             )
 
-        extra_info = getattr(module, "EXTRA_INFO", [])
+        if "EXTRA_INFO" in entry["dynamic"]:
+            # EXTRA_INFO is a function or refers to data of a service
+            extra_info = import_source(modules, f).EXTRA_INFO
+        else:
+            extra_info = attributes.get("EXTRA_INFO", [])
         if callable(extra_info):
             extra_info = extra_info()
         for e in extra_info:
@@ -121,6 +125,16 @@ def browse_sources():
                 )
             )
 
+    # these sources provide their service lists as module attributes
+    for f in (
+        "awido_de",
+        "c_trace_de",
+        "citiesapps_com",
+        "app_abfallplus_de",
+        "abfallnavi_de",
+    ):
+        import_source(modules, f)
+
     update_awido_de(modules)
     update_ctrace_de(modules)
     update_citiesapps_com(modules)
@@ -130,6 +144,13 @@ def browse_sources():
     return sources
 
 
+def import_source(modules, f):
+    """Import source module f, cached in modules."""
+    if f not in modules:
+        modules[f] = importlib.import_module(f"waste_collection_schedule.source.{f}")
+    return modules[f]
+
+
 def browse_ics_yaml():
     """Browse all .yaml files which are descriptions for the ICS source"""
     doc_dir = Path(__file__).resolve().parents[0] / "doc"